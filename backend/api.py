@@ -3,29 +3,43 @@ FastAPI REST API for Platform Leveling System - Production Ready
 Includes: Authentication, Rate Limiting, Caching, Logging, Monitoring, Database
 """
 
-import json
+import asyncio
 import logging
 import math
+import sys
+import threading
 import time
 from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List, Literal, Optional
+from functools import lru_cache
+from typing import Annotated, List, Literal, Optional, Tuple, Union
 
+import msgspec
 import numpy as np
-from fastapi import Depends, FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi import (
+    Body,
+    Depends,
+    FastAPI,
+    HTTPException,
+    Query,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from prometheus_fastapi_instrumentator import Instrumentator
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, model_validator
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
 
 from auth import optional_api_key, verify_api_key
-from cache import generate_cache_key, get_cache_stats, get_cached, init_cache, set_cached
+from cache import generate_ik_cache_key, get_cache_stats, get_cached, init_cache, set_cached
 from config import settings
-from database import init_db
-from logging_config import log_request, setup_logging
+from database import close_db, init_db
+from ik_kernel import ik_batch_kernel, make_ik_kernel
+from logging_config import log_request, setup_logging, traceback_allowed
 
 # Set up logging
 setup_logging()
@@ -50,6 +64,10 @@ async def lifespan(app: FastAPI):
         init_db()
         logger.info("✓ Database initialized")
 
+    # Load the compiled kernels and fill the geometry caches before the first request
+    warm_up_ik()
+    logger.info("✓ IK kernels warmed up")
+
     logger.info("✓ API started successfully")
 
     yield
@@ -57,6 +75,9 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down API...")
 
+    if settings.database_enabled:
+        close_db()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -64,6 +85,7 @@ app = FastAPI(
     description="Production-ready API for Stewart Platform and Tripod inverse kinematics",
     version="2.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware with proper configuration
@@ -79,8 +101,16 @@ app.add_middleware(
 # Request logging middleware
 app.middleware("http")(log_request)
 
-# Rate limiting
-limiter = Limiter(key_func=get_remote_address)
+# Rate limiting; with Redis enabled the counters are shared by all workers and
+# each hit is a single atomic round trip, otherwise they stay in process memory
+limiter = Limiter(
+    key_func=get_remote_address,
+    enabled=settings.rate_limit_enabled,
+    storage_uri=settings.redis_url if settings.redis_enabled else "memory://",
+    strategy="fixed-window",
+    in_memory_fallback_enabled=True,
+)
+RATE_LIMIT = f"{settings.rate_limit_per_minute}/minute"
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
@@ -105,10 +135,10 @@ async def global_exception_handler(request: Request, exc: Exception):
             "method": request.method,
             "error": str(exc),
         },
-        exc_info=True,
+        exc_info=traceback_allowed(exc),
     )
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Internal server error",
@@ -118,10 +148,16 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 
+ConfigurationName = Literal["3-3", "4-4", "6-3", "6-3-asymmetric", "6-3-redundant", "6-6", "8-8"]
+
+
 # Pydantic models with validation
 class PlatformConfigModel(BaseModel):
     """Platform geometry configuration with validation"""
 
+    # Non-finite values are rejected by pydantic-core itself, not a Python validator
+    model_config = ConfigDict(allow_inf_nan=False)
+
     base_radius: float = Field(default=120.0, ge=10.0, le=500.0, description="Base radius in mm")
     platform_radius: float = Field(
         default=70.0, ge=10.0, le=500.0, description="Platform radius in mm"
@@ -136,24 +172,19 @@ class PlatformConfigModel(BaseModel):
         default=200.0, ge=10.0, le=2000.0, description="Maximum leg length in mm"
     )
 
-    @validator("*")
-    def check_finite(cls, v):
-        """Ensure all values are finite"""
-        if isinstance(v, (int, float)) and not math.isfinite(v):
-            raise ValueError("Value must be finite (not NaN or Inf)")
-        return v
-
-    @validator("max_leg_length")
-    def check_max_greater_than_min(cls, v, values):
+    @model_validator(mode="after")
+    def check_max_greater_than_min(self):
         """Ensure max > min"""
-        if "min_leg_length" in values and v <= values["min_leg_length"]:
+        if self.max_leg_length <= self.min_leg_length:
             raise ValueError("max_leg_length must be greater than min_leg_length")
-        return v
+        return self
 
 
 class PoseRequest(BaseModel):
     """Request for inverse kinematics calculation with strict validation"""
 
+    model_config = ConfigDict(allow_inf_nan=False)
+
     x: float = Field(default=0.0, ge=-1000.0, le=1000.0, description="X translation in mm")
     y: float = Field(default=0.0, ge=-1000.0, le=1000.0, description="Y translation in mm")
     z: float = Field(default=0.0, ge=-500.0, le=500.0, description="Z translation in mm")
@@ -161,21 +192,12 @@ class PoseRequest(BaseModel):
     pitch: float = Field(default=0.0, ge=-90.0, le=90.0, description="Pitch angle in degrees")
     yaw: float = Field(default=0.0, ge=-180.0, le=180.0, description="Yaw angle in degrees")
 
-    configuration: Literal["3-3", "4-4", "6-3", "6-3-asymmetric", "6-3-redundant", "6-6", "8-8"] = (
-        Field(default="6-3", description="Platform configuration")
-    )
+    configuration: ConfigurationName = Field(default="6-3", description="Platform configuration")
 
     geometry: Optional[PlatformConfigModel] = Field(
         default=None, description="Optional custom geometry parameters"
     )
 
-    @validator("x", "y", "z", "roll", "pitch", "yaw")
-    def check_finite(cls, v):
-        """Ensure all pose values are finite"""
-        if not math.isfinite(v):
-            raise ValueError("Value must be finite (not NaN or Inf)")
-        return v
-
 
 class LegLengthResponse(BaseModel):
     """Response with calculated leg lengths"""
@@ -188,6 +210,14 @@ class LegLengthResponse(BaseModel):
     calculation_time_ms: float = Field(description="Calculation time in milliseconds")
 
 
+class BatchLegLengthResponse(BaseModel):
+    """Response with calculated leg lengths for a batch of poses"""
+
+    leg_lengths: List[List[float]] = Field(description="Leg lengths in mm, one list per pose")
+    valid: List[bool] = Field(description="Whether each solution is within limits")
+    calculation_time_ms: float = Field(description="Calculation time in milliseconds")
+
+
 class HealthResponse(BaseModel):
     """API health check response"""
 
@@ -199,139 +229,286 @@ class HealthResponse(BaseModel):
     services: dict
 
 
+# Results built by calculate_ik are trusted, so serialize them with a prebuilt
+# adapter instead of validating them again on the way out
+LEG_LENGTH_ADAPTER = TypeAdapter(LegLengthResponse)
+
+
+def leg_length_response(result: dict) -> Response:
+    """Serialize an IK result dict as a LegLengthResponse without re-validation"""
+    return Response(
+        content=LEG_LENGTH_ADAPTER.dump_json(LegLengthResponse.model_construct(**result)),
+        media_type="application/json",
+    )
+
+
+# msgspec structs for the WebSocket stream (same fields and bounds as the Pydantic models)
+class PlatformConfigMsg(msgspec.Struct):
+    """Platform geometry decoded straight from a WebSocket frame"""
+
+    base_radius: Annotated[float, msgspec.Meta(ge=10.0, le=500.0)] = 120.0
+    platform_radius: Annotated[float, msgspec.Meta(ge=10.0, le=500.0)] = 70.0
+    nominal_leg_length: Annotated[float, msgspec.Meta(ge=50.0, le=1000.0)] = 150.0
+    min_leg_length: Annotated[float, msgspec.Meta(ge=10.0, le=1000.0)] = 100.0
+    max_leg_length: Annotated[float, msgspec.Meta(ge=10.0, le=2000.0)] = 200.0
+
+    def __post_init__(self):
+        if self.max_leg_length <= self.min_leg_length:
+            raise ValueError("max_leg_length must be greater than min_leg_length")
+
+
+class PoseMsg(msgspec.Struct):
+    """Pose decoded straight from a WebSocket frame"""
+
+    x: Annotated[float, msgspec.Meta(ge=-1000.0, le=1000.0)] = 0.0
+    y: Annotated[float, msgspec.Meta(ge=-1000.0, le=1000.0)] = 0.0
+    z: Annotated[float, msgspec.Meta(ge=-500.0, le=500.0)] = 0.0
+    roll: Annotated[float, msgspec.Meta(ge=-90.0, le=90.0)] = 0.0
+    pitch: Annotated[float, msgspec.Meta(ge=-90.0, le=90.0)] = 0.0
+    yaw: Annotated[float, msgspec.Meta(ge=-180.0, le=180.0)] = 0.0
+    configuration: ConfigurationName = "6-3"
+    geometry: Optional[PlatformConfigMsg] = None
+
+
+class PoseEchoMsg(msgspec.Struct):
+    """Requested pose echoed back in a WebSocket result"""
+
+    x: float = 0.0
+    y: float = 0.0
+    z: float = 0.0
+    roll: float = 0.0
+    pitch: float = 0.0
+    yaw: float = 0.0
+
+
+class LegLengthMsg(msgspec.Struct):
+    """WebSocket result frame, same shape as LegLengthResponse without the cache flag"""
+
+    leg_lengths: List[float]
+    valid: bool
+    configuration: str
+    pose: PoseEchoMsg
+    calculation_time_ms: float
+
+
+POSE_DECODER = msgspec.json.Decoder(PoseMsg)
+RESULT_ENCODER = msgspec.json.Encoder()
+
+
 # Global configuration cache
 current_config = PlatformConfigModel()
 
 
+def _leg_pairs(*indices: int) -> np.ndarray:
+    """Read-only integer array of the platform point index driven by each leg"""
+    leg_pairs = np.asarray(indices, dtype=np.intp)
+    leg_pairs.setflags(write=False)
+    return leg_pairs
+
+
+# Base and platform point configurations for each setup
+_CONFIG_MAP = {
+    "3-3": {"num_base": 3, "num_platform": 3, "leg_pairs": _leg_pairs(0, 1, 2)},
+    "4-4": {"num_base": 4, "num_platform": 4, "leg_pairs": _leg_pairs(0, 1, 2, 3)},
+    "6-3": {"num_base": 6, "num_platform": 3, "leg_pairs": _leg_pairs(0, 0, 1, 1, 2, 2)},
+    "6-3-asymmetric": {
+        "num_base": 6,
+        "num_platform": 3,
+        "leg_pairs": _leg_pairs(0, 1, 1, 2, 2, 0),
+    },
+    "6-3-redundant": {
+        "num_base": 6,
+        "num_platform": 3,
+        "leg_pairs": _leg_pairs(0, 1, 1, 2, 2, 0),
+    },
+    "6-6": {"num_base": 6, "num_platform": 6, "leg_pairs": _leg_pairs(*range(6))},
+    "8-8": {"num_base": 8, "num_platform": 8, "leg_pairs": _leg_pairs(*range(8))},
+}
+
+# Single-pose kernel with the leg count and leg_pairs baked in as constants;
+# configurations with the same layout share one compiled kernel
+for _mapping in _CONFIG_MAP.values():
+    _mapping["kernel"] = make_ik_kernel(tuple(_mapping["leg_pairs"].tolist()))
+
+
 def get_configuration_mapping(config: str) -> dict:
     """Get base and platform point configurations for each setup"""
-    configurations = {
-        "3-3": {"num_base": 3, "num_platform": 3, "leg_pairs": list(range(3))},
-        "4-4": {"num_base": 4, "num_platform": 4, "leg_pairs": list(range(4))},
-        "6-3": {"num_base": 6, "num_platform": 3, "leg_pairs": [0, 0, 1, 1, 2, 2]},
-        "6-3-asymmetric": {
-            "num_base": 6,
-            "num_platform": 3,
-            "leg_pairs": [0, 1, 1, 2, 2, 0],
-        },
-        "6-3-redundant": {
-            "num_base": 6,
-            "num_platform": 3,
-            "leg_pairs": [0, 1, 1, 2, 2, 0],
-        },
-        "6-6": {"num_base": 6, "num_platform": 6, "leg_pairs": list(range(6))},
-        "8-8": {"num_base": 8, "num_platform": 8, "leg_pairs": list(range(8))},
-    }
-    return configurations.get(config, configurations["6-3"])
+    return _CONFIG_MAP.get(config, _CONFIG_MAP["6-3"])
 
 
-def generate_points(n: int, radius: float, angle_offset: float = 0) -> np.ndarray:
-    """Generate n points in a circular pattern"""
-    points = []
-    for i in range(n):
-        angle = 2 * np.pi * i / n + angle_offset
-        x = radius * np.cos(angle)
-        y = radius * np.sin(angle)
-        points.append([x, y, 0])
-    return np.array(points)
+def get_leg_pair_indices(config: str) -> np.ndarray:
+    """Get the platform point index for each leg as a read-only integer array"""
+    return get_configuration_mapping(config)["leg_pairs"]
 
 
-def calculate_ik(pose: PoseRequest, request: Optional[Request] = None) -> dict:
+def generate_points(n: int, radius: float, angle_offset: float = 0, z: float = 0.0) -> np.ndarray:
+    """Generate n points in a circular pattern at height z as a float32 (n, 3) array"""
+    angles = np.linspace(angle_offset, angle_offset + 2 * np.pi, n, endpoint=False)
+    points = np.empty((n, 3), dtype=np.float32)
+    np.multiply(np.cos(angles), radius, out=points[:, 0])
+    np.multiply(np.sin(angles), radius, out=points[:, 1])
+    points[:, 2] = z
+    return points
+
+
+@lru_cache(maxsize=64)
+def _points_cached(n: int, radius: float, angle_offset: float, z: float = 0.0) -> np.ndarray:
     """
-    Calculate inverse kinematics for given pose
+    Memoized, read-only generate_points for geometry that rarely changes
+
+    Returns a (3, n) structure-of-arrays layout, so xs, ys and zs are each
+    a contiguous float32 row.
+    """
+    points = np.ascontiguousarray(generate_points(n, radius, angle_offset, z).T)
+    points.setflags(write=False)
+    return points
+
+
+@lru_cache(maxsize=64)
+def get_geometry_arrays(
+    config: str, base_radius: float, platform_radius: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Get cached (base_points, platform_points, leg_pairs) arrays for a configuration
+
+    The whole triple is memoized per configuration and geometry, so a request
+    costs one dict lookup. Points are (3, N) float32 rows of xs, ys and zs.
+    Platform points are generated at z = 0 so they rotate about the platform
+    center; the nominal leg length is applied once, in the translation.
+    All arrays are read-only.
+    """
+    config_map = get_configuration_mapping(config)
+    num_base = config_map["num_base"]
+    num_platform = config_map["num_platform"]
+
+    base_points = _points_cached(num_base, base_radius, 0.0)
+    platform_points = _points_cached(
+        num_platform,
+        platform_radius,
+        np.pi / num_platform if num_platform < 6 else np.pi / 6,
+    )
+    return base_points, platform_points, get_leg_pair_indices(config)
+
+
+# Largest leg count of any configuration, i.e. the size of a leg length workspace
+MAX_LEGS = max(mapping["num_base"] for mapping in _CONFIG_MAP.values())
+
+_workspace = threading.local()
+
+
+def ik_workspace() -> np.ndarray:
+    """Get this thread's reusable leg length buffer for REST requests"""
+    buffer = getattr(_workspace, "lengths", None)
+    if buffer is None:
+        buffer = _workspace.lengths = np.empty(MAX_LEGS)
+    return buffer
+
+
+def solve_ik(
+    pose: Union[PoseRequest, PoseMsg],
+    out: Optional[np.ndarray] = None,
+    arrays: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None,
+) -> Tuple[np.ndarray, bool, float]:
+    """
+    Solve leg lengths for a pose without packaging the result
 
     Args:
-        pose: Pose request with configuration and geometry
-        request: Optional FastAPI request object for logging
+        pose: Pose request (or WebSocket PoseMsg) with configuration and geometry
+        out: Workspace of MAX_LEGS floats to write into (default: per-thread buffer)
+        arrays: Geometry arrays already looked up for this pose (default: looked up here)
 
     Returns:
-        Dictionary with leg lengths and metadata
+        Tuple of (leg lengths view into the workspace, validity, calculation time in ms).
+        The view is overwritten by the next call with the same workspace.
     """
     start_time = time.time()
 
-    try:
-        # Use provided geometry or default
-        geometry = pose.geometry if pose.geometry else current_config
+    # Use provided geometry or default
+    geometry = pose.geometry if pose.geometry else current_config
 
-        # Convert angles to radians
-        roll_rad = np.deg2rad(pose.roll)
-        pitch_rad = np.deg2rad(pose.pitch)
-        yaw_rad = np.deg2rad(pose.yaw)
-
-        # Get configuration mapping
-        config_map = get_configuration_mapping(pose.configuration)
-        num_base = config_map["num_base"]
-        num_platform = config_map["num_platform"]
-        leg_pairs = config_map["leg_pairs"]
-
-        # Generate base and platform points
-        base_points = generate_points(num_base, geometry.base_radius, 0)
-        platform_points = generate_points(
-            num_platform,
-            geometry.platform_radius,
-            np.pi / num_platform if num_platform < 6 else np.pi / 6,
+    # Base and platform points for this configuration
+    if arrays is None:
+        arrays = get_geometry_arrays(
+            pose.configuration, geometry.base_radius, geometry.platform_radius
         )
+    base_points, platform_points, _ = arrays
+
+    # Rotate, translate, measure and limit-check every leg in one compiled pass
+    if out is None:
+        out = ik_workspace()
+    kernel = get_configuration_mapping(pose.configuration)["kernel"]
+    valid = kernel(
+        base_points,
+        platform_points,
+        math.radians(pose.roll),
+        math.radians(pose.pitch),
+        math.radians(pose.yaw),
+        pose.x,
+        pose.y,
+        pose.z + geometry.nominal_leg_length,
+        geometry.min_leg_length,
+        geometry.max_leg_length,
+        out,
+    )
+    lengths = out[: base_points.shape[1]]
 
-        # Create rotation matrix
-        def rotation_matrix(roll, pitch, yaw):
-            Rx = np.array(
-                [
-                    [1, 0, 0],
-                    [0, np.cos(roll), -np.sin(roll)],
-                    [0, np.sin(roll), np.cos(roll)],
-                ]
-            )
-
-            Ry = np.array(
-                [
-                    [np.cos(pitch), 0, np.sin(pitch)],
-                    [0, 1, 0],
-                    [-np.sin(pitch), 0, np.cos(pitch)],
-                ]
-            )
-
-            Rz = np.array(
-                [
-                    [np.cos(yaw), -np.sin(yaw), 0],
-                    [np.sin(yaw), np.cos(yaw), 0],
-                    [0, 0, 1],
-                ]
-            )
+    calculation_time = (time.time() - start_time) * 1000  # ms
 
-            return Rz @ Ry @ Rx
+    # Runs for every pose and WebSocket frame; requests are already logged by the
+    # middleware, so only build the record when debug logging is on
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "IK calculation completed",
+            extra={
+                "configuration": pose.configuration,
+                "valid": valid,
+                "calculation_time_ms": calculation_time,
+            },
+        )
 
-        R = rotation_matrix(roll_rad, pitch_rad, yaw_rad)
+    return lengths, valid, calculation_time
 
-        # Translation vector
-        translation = np.array([pose.x, pose.y, pose.z + geometry.nominal_leg_length])
 
-        # Calculate leg lengths
-        leg_lengths = []
-        for i in range(num_base):
-            # Get corresponding platform point
-            platform_idx = leg_pairs[i]
+def warm_up_ik():
+    """
+    Run every configuration through the IK kernels once
 
-            # Transform platform point
-            platform_point = platform_points[platform_idx].copy()
-            platform_point[2] = geometry.nominal_leg_length
+    The kernels are compiled eagerly (and loaded from Numba's on-disk cache),
+    so this mainly primes the geometry caches for the default geometry.
+    """
+    for config in _CONFIG_MAP:
+        pose = PoseMsg(configuration=config)
+        solve_ik(pose)
+        base_points, platform_points, leg_pairs = get_geometry_arrays(
+            config, current_config.base_radius, current_config.platform_radius
+        )
+        ik_batch_kernel(
+            base_points,
+            platform_points,
+            leg_pairs,
+            np.zeros((1, 3)),
+            np.array([[0.0, 0.0, current_config.nominal_leg_length]]),
+            current_config.min_leg_length,
+            current_config.max_leg_length,
+        )
 
-            # Apply rotation and translation
-            rotated_point = R @ platform_point + translation
 
-            # Calculate distance from base to transformed platform point
-            base_point_with_z = base_points[i].copy()
-            leg_length = np.linalg.norm(rotated_point - base_point_with_z)
-            leg_lengths.append(float(leg_length))
+def calculate_ik(pose: Union[PoseRequest, PoseMsg], request: Optional[Request] = None) -> dict:
+    """
+    Calculate inverse kinematics for given pose
 
-        # Check validity
-        valid = all(
-            geometry.min_leg_length <= length <= geometry.max_leg_length for length in leg_lengths
-        )
+    Args:
+        pose: Pose request (or WebSocket PoseMsg) with configuration and geometry
+        request: Optional FastAPI request object for logging
 
-        calculation_time = (time.time() - start_time) * 1000  # ms
+    Returns:
+        Dictionary with leg lengths and metadata
+    """
+    try:
+        lengths, valid, calculation_time = solve_ik(pose)
 
-        result = {
-            "leg_lengths": leg_lengths,
+        return {
+            "leg_lengths": lengths.tolist(),
             "valid": valid,
             "configuration": pose.configuration,
             "pose": {
@@ -345,69 +522,143 @@ def calculate_ik(pose: PoseRequest, request: Optional[Request] = None) -> dict:
             "calculation_time_ms": calculation_time,
         }
 
-        logger.info(
-            "IK calculation completed",
-            extra={
-                "configuration": pose.configuration,
-                "valid": valid,
-                "calculation_time_ms": calculation_time,
-            },
+    except Exception as e:
+        logger.error(f"IK calculation failed: {e!r}", exc_info=traceback_allowed(e))
+        raise HTTPException(status_code=500, detail=f"Calculation failed: {str(e)}")
+
+
+# Batches at least this large are solved off the event loop
+BATCH_OFFLOAD_THRESHOLD = 256
+
+
+def calculate_ik_batch(poses: List[PoseRequest]) -> dict:
+    """
+    Calculate inverse kinematics for many poses at once
+
+    Poses sharing a configuration and geometry are evaluated together by a
+    compiled kernel that spreads the batch across CPU threads.
+
+    Args:
+        poses: Pose requests, each with its own configuration and geometry
+
+    Returns:
+        Dictionary with per-pose leg lengths and validity
+    """
+    start_time = time.time()
+
+    leg_lengths: List[List[float]] = [[] for _ in poses]
+    valid: List[bool] = [False] * len(poses)
+
+    # Group poses that can share the same base/platform points
+    groups: dict = {}
+    for i, pose in enumerate(poses):
+        geometry = pose.geometry if pose.geometry else current_config
+        key = (
+            pose.configuration,
+            geometry.base_radius,
+            geometry.platform_radius,
+            geometry.nominal_leg_length,
+            geometry.min_leg_length,
+            geometry.max_leg_length,
         )
+        groups.setdefault(key, []).append(i)
 
-        return result
+    try:
+        for (config, base_r, plat_r, nominal, min_len, max_len), indices in groups.items():
+            base_points, platform_points, leg_pairs = get_geometry_arrays(config, base_r, plat_r)
+            group = [poses[i] for i in indices]
+
+            # (B, 3) angles and translations
+            angles = np.radians([[p.roll, p.pitch, p.yaw] for p in group])
+            translations = np.array([[p.x, p.y, p.z + nominal] for p in group])
+
+            # (B, N) leg lengths and (B,) validity, poses solved in parallel
+            lengths, group_valid = ik_batch_kernel(
+                base_points, platform_points, leg_pairs, angles, translations, min_len, max_len
+            )
+
+            for row, i in enumerate(indices):
+                leg_lengths[i] = lengths[row].tolist()
+                valid[i] = bool(group_valid[row])
 
     except Exception as e:
-        logger.error(f"IK calculation failed: {e}", exc_info=True)
+        logger.error(f"Batch IK calculation failed: {e!r}", exc_info=traceback_allowed(e))
         raise HTTPException(status_code=500, detail=f"Calculation failed: {str(e)}")
 
+    calculation_time = (time.time() - start_time) * 1000  # ms
+
+    logger.info(
+        "Batch IK calculation completed",
+        extra={"batch_size": len(poses), "calculation_time_ms": calculation_time},
+    )
+
+    return {
+        "leg_lengths": leg_lengths,
+        "valid": valid,
+        "calculation_time_ms": calculation_time,
+    }
+
 
 # API Endpoints
 
 
+# Health payloads only depend on settings, apart from the timestamp and cache stats
+_ROOT_HEALTH = {
+    "status": "ok",
+    "message": "Platform Leveling API is running",
+    "version": "2.0.0",
+    "environment": settings.environment,
+    "services": {
+        "cache": settings.redis_enabled,
+        "database": settings.database_enabled,
+        "auth": bool(settings.api_key),
+    },
+}
+_DETAILED_HEALTH = {
+    "status": "healthy",
+    "message": "All systems operational",
+    "version": "2.0.0",
+    "environment": settings.environment,
+}
+_DETAILED_SERVICES = {
+    "api": "healthy",
+    "cache": "enabled" if settings.redis_enabled else "disabled",
+    "database": "enabled" if settings.database_enabled else "disabled",
+    "auth": "enabled" if settings.api_key else "disabled",
+}
+
+_now_cache = {"bucket": None, "value": None}
+
+
+def _cached_utcnow() -> datetime:
+    """datetime.utcnow() refreshed at most once per second"""
+    bucket = int(time.monotonic())
+    if _now_cache["bucket"] != bucket:
+        _now_cache["bucket"] = bucket
+        _now_cache["value"] = datetime.utcnow()
+    return _now_cache["value"]
+
+
 @app.get("/", response_model=HealthResponse)
 async def root():
     """Root endpoint with basic health info"""
-    return HealthResponse(
-        status="ok",
-        message="Platform Leveling API is running",
-        version="2.0.0",
-        environment=settings.environment,
-        timestamp=datetime.utcnow(),
-        services={
-            "cache": settings.redis_enabled,
-            "database": settings.database_enabled,
-            "auth": bool(settings.api_key),
-        },
-    )
+    return {**_ROOT_HEALTH, "timestamp": _cached_utcnow()}
 
 
 @app.get("/health", response_model=HealthResponse)
 async def health():
     """Detailed health check with service status"""
-    services = {
-        "api": "healthy",
-        "cache": "enabled" if settings.redis_enabled else "disabled",
-        "database": "enabled" if settings.database_enabled else "disabled",
-        "auth": "enabled" if settings.api_key else "disabled",
-    }
+    services = _DETAILED_SERVICES
 
     # Check cache if enabled
     if settings.redis_enabled:
-        cache_stats = get_cache_stats()
-        services["cache_stats"] = cache_stats
-
-    return HealthResponse(
-        status="healthy",
-        message="All systems operational",
-        version="2.0.0",
-        environment=settings.environment,
-        timestamp=datetime.utcnow(),
-        services=services,
-    )
+        services = {**_DETAILED_SERVICES, "cache_stats": get_cache_stats()}
+
+    return {**_DETAILED_HEALTH, "timestamp": _cached_utcnow(), "services": services}
 
 
 @app.post("/calculate", response_model=LegLengthResponse)
-@limiter.limit(f"{settings.rate_limit_per_minute}/minute")
+@limiter.limit(RATE_LIMIT)
 async def calculate_leg_lengths(
     request: Request,
     pose: PoseRequest,
@@ -420,12 +671,12 @@ async def calculate_leg_lengths(
     Results are cached for improved performance.
     """
     # Check cache first
-    cache_key = generate_cache_key("ik", pose.dict())
+    cache_key = generate_ik_cache_key(pose, current_config)
     cached_result = get_cached(cache_key)
 
     if cached_result:
-        cached_result["cached"] = True
-        return LegLengthResponse(**cached_result)
+        # Cached dicts may be shared with the in-process L1, so don't mutate them
+        return leg_length_response({**cached_result, "cached": True})
 
     # Calculate IK
     result = calculate_ik(pose, request)
@@ -434,17 +685,60 @@ async def calculate_leg_lengths(
     # Cache the result
     set_cached(cache_key, result, expiration=300)  # 5 minutes
 
-    return LegLengthResponse(**result)
+    return leg_length_response(result)
+
+
+@app.post("/calculate_fast", response_model=LegLengthResponse)
+@limiter.limit(RATE_LIMIT)
+async def calculate_leg_lengths_fast(request: Request):
+    """
+    Calculate inverse kinematics with minimal per-request overhead
+
+    Same body and response as /calculate, but the raw JSON body is decoded
+    straight into a msgspec struct: no Pydantic validation, dependency
+    resolution (API key) or result caching. Only the msgspec type and range
+    constraints are checked.
+    """
+    try:
+        pose = POSE_DECODER.decode(await request.body())
+    except (msgspec.ValidationError, msgspec.DecodeError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    result = calculate_ik(pose, request)
+    result["cached"] = False
+    return Response(content=RESULT_ENCODER.encode(result), media_type="application/json")
+
+
+@app.post("/calculate_batch", response_model=BatchLegLengthResponse)
+@limiter.limit(RATE_LIMIT)
+async def calculate_batch(
+    request: Request,
+    poses: List[PoseRequest] = Body(min_length=1, max_length=settings.max_batch_size),
+    api_key: Optional[str] = Depends(optional_api_key),
+):
+    """
+    Calculate inverse kinematics for a list of poses
+
+    Evaluates all poses in one vectorized pass, amortizing the per-request
+    overhead of /calculate across the whole batch. Single poses take a few
+    microseconds and are solved inline on the event loop; only large batches
+    are worth handing to a worker thread (the kernel releases the GIL).
+    """
+    if len(poses) >= BATCH_OFFLOAD_THRESHOLD:
+        result = await asyncio.to_thread(calculate_ik_batch, poses)
+    else:
+        result = calculate_ik_batch(poses)
+    return BatchLegLengthResponse(**result)
 
 
 @app.post("/level")
-@limiter.limit(f"{settings.rate_limit_per_minute}/minute")
+@limiter.limit(RATE_LIMIT)
 async def calculate_leveling(
     request: Request,
-    roll: float = Field(description="Current roll angle in degrees"),
-    pitch: float = Field(description="Current pitch angle in degrees"),
-    yaw: float = Field(default=0.0, description="Current yaw angle in degrees"),
-    configuration: str = Field(default="6-3", description="Platform configuration"),
+    roll: float = Query(description="Current roll angle in degrees"),
+    pitch: float = Query(description="Current pitch angle in degrees"),
+    yaw: float = Query(default=0.0, description="Current yaw angle in degrees"),
+    configuration: str = Query(default="6-3", description="Platform configuration"),
 ):
     """
     Calculate leg lengths needed to level the platform
@@ -464,7 +758,7 @@ async def calculate_leveling(
 
     result = calculate_ik(pose, request)
     result["cached"] = False
-    return LegLengthResponse(**result)
+    return leg_length_response(result)
 
 
 @app.get("/config", response_model=PlatformConfigModel)
@@ -491,10 +785,9 @@ async def update_config(config: PlatformConfigModel, api_key: str = Depends(veri
     return current_config
 
 
-@app.get("/configurations")
-async def get_available_configurations():
-    """Get list of available platform configurations"""
-    return {
+# The configuration list never changes, so serialize it once at import
+_CONFIGURATIONS_JSON = msgspec.json.encode(
+    {
         "configurations": [
             {
                 "id": "3-3",
@@ -540,38 +833,88 @@ async def get_available_configurations():
             },
         ]
     }
+)
+
+
+@app.get("/configurations")
+async def get_available_configurations():
+    """Get list of available platform configurations"""
+    return Response(content=_CONFIGURATIONS_JSON, media_type="application/json")
 
 
-# WebSocket endpoint for real-time updates
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """
     WebSocket endpoint for real-time pose updates
 
-    Client sends pose data, server responds with leg lengths
+    Client sends pose data, server responds with leg lengths. Poses are JSON in
+    either text or binary frames; binary frames are decoded straight from bytes
+    and answered in binary, skipping the UTF-8 str round trip. Invalid poses are
+    answered with {"error": ...} and the connection stays open.
     """
     await websocket.accept()
     logger.info("WebSocket client connected")
 
+    # One result frame per connection, refilled in place for every message
+    frame = LegLengthMsg(
+        leg_lengths=[], valid=False, configuration="", pose=PoseEchoMsg(), calculation_time_ms=0.0
+    )
+    echo = frame.pose
+    workspace = np.empty(MAX_LEGS)
+
+    # Clients usually hold configuration and geometry fixed while sweeping the
+    # pose, so keep the last geometry arrays and only look up new ones on change
+    geometry_key = None
+    arrays = None
+
     try:
         while True:
-            # Receive pose data
-            data = await websocket.receive_text()
-            pose_data = json.loads(data)
-
-            # Create PoseRequest from received data
-            pose = PoseRequest(**pose_data)
+            # Receive pose data (text or binary frame, JSON either way)
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            raw = message.get("bytes")
+            binary = raw is not None
+
+            # Decode and validate straight into a struct; a bad frame gets an error
+            # reply instead of tearing down the stream
+            try:
+                pose = POSE_DECODER.decode(raw if binary else message["text"])
+            except msgspec.DecodeError as e:
+                payload = RESULT_ENCODER.encode({"error": str(e)})
+                if binary:
+                    await websocket.send_bytes(payload)
+                else:
+                    await websocket.send_text(payload.decode())
+                continue
+
+            geometry = pose.geometry if pose.geometry else current_config
+            key = (pose.configuration, geometry.base_radius, geometry.platform_radius)
+            if key != geometry_key:
+                geometry_key = key
+                arrays = get_geometry_arrays(*key)
 
             # Calculate IK
-            result = calculate_ik(pose)
-
-            # Send back result
-            await websocket.send_json(result)
+            lengths, valid, calculation_time = solve_ik(pose, workspace, arrays)
+
+            frame.leg_lengths = lengths.tolist()
+            frame.valid = valid
+            frame.configuration = pose.configuration
+            frame.calculation_time_ms = calculation_time
+            echo.x, echo.y, echo.z = pose.x, pose.y, pose.z
+            echo.roll, echo.pitch, echo.yaw = pose.roll, pose.pitch, pose.yaw
+
+            # Send back result in the same frame type the client used
+            payload = RESULT_ENCODER.encode(frame)
+            if binary:
+                await websocket.send_bytes(payload)
+            else:
+                await websocket.send_text(payload.decode())
 
     except WebSocketDisconnect:
         logger.info("WebSocket client disconnected")
     except Exception as e:
-        logger.error(f"WebSocket error: {e}", exc_info=True)
+        logger.error(f"WebSocket error: {e!r}", exc_info=traceback_allowed(e))
         await websocket.close()
 
 
@@ -587,9 +930,16 @@ if __name__ == "__main__":
     print(f"Metrics: http://{settings.api_host}:{settings.api_port}/metrics")
     print("=" * 60)
 
+    # uvloop/httptools come with uvicorn[standard]; uvloop has no Windows build.
+    # Uvicorn can only fork workers from an import string, not an app object.
+    # current_config is process-local, so POST /config only reaches one worker.
     uvicorn.run(
-        app,
+        "api:app" if settings.api_workers > 1 else app,
         host=settings.api_host,
         port=settings.api_port,
         log_level=settings.log_level.lower(),
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        ws="websockets",
+        workers=settings.api_workers,
     )
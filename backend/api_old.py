@@ -4,7 +4,7 @@ Exposes inverse kinematics calculations and platform control
 """
 
 import json
-from dataclasses import asdict
+import math
 from typing import List, Literal, Optional
 
 import numpy as np
@@ -109,13 +109,30 @@ def get_configuration_mapping(config: str) -> dict:
 
 def generate_points(n: int, radius: float, angle_offset: float = 0) -> np.ndarray:
     """Generate n points in a circular pattern"""
-    points = []
-    for i in range(n):
-        angle = 2 * np.pi * i / n + angle_offset
-        x = radius * np.cos(angle)
-        y = radius * np.sin(angle)
-        points.append([x, y, 0])
-    return np.array(points)
+    angles = 2 * np.pi * np.arange(n) / n + angle_offset
+    points = np.zeros((n, 3))
+    np.multiply(np.cos(angles), radius, out=points[:, 0])
+    np.multiply(np.sin(angles), radius, out=points[:, 1])
+    return points
+
+
+def rotation_matrix(roll: float, pitch: float, yaw: float) -> np.ndarray:
+    """Closed-form ZYX rotation R = Rz @ Ry @ Rx (angles in radians)"""
+    sr, cr = math.sin(roll), math.cos(roll)
+    sp, cp = math.sin(pitch), math.cos(pitch)
+    sy, cy = math.sin(yaw), math.cos(yaw)
+
+    R = np.empty((3, 3))
+    R[0, 0] = cy * cp
+    R[0, 1] = cy * sp * sr - sy * cr
+    R[0, 2] = cy * sp * cr + sy * sr
+    R[1, 0] = sy * cp
+    R[1, 1] = sy * sp * sr + cy * cr
+    R[1, 2] = sy * sp * cr - cy * sr
+    R[2, 0] = -sp
+    R[2, 1] = cp * sr
+    R[2, 2] = cp * cr
+    return R
 
 
 def calculate_ik(pose: PoseRequest) -> LegLengthResponse:
@@ -144,45 +161,23 @@ def calculate_ik(pose: PoseRequest) -> LegLengthResponse:
     )
 
     # Create rotation matrix
-    def rotation_matrix(roll, pitch, yaw):
-        Rx = np.array(
-            [[1, 0, 0], [0, np.cos(roll), -np.sin(roll)], [0, np.sin(roll), np.cos(roll)]]
-        )
-
-        Ry = np.array(
-            [[np.cos(pitch), 0, np.sin(pitch)], [0, 1, 0], [-np.sin(pitch), 0, np.cos(pitch)]]
-        )
-
-        Rz = np.array([[np.cos(yaw), -np.sin(yaw), 0], [np.sin(yaw), np.cos(yaw), 0], [0, 0, 1]])
-
-        return Rz @ Ry @ Rx
-
     R = rotation_matrix(roll_rad, pitch_rad, yaw_rad)
 
     # Translation vector
     translation = np.array([pose.x, pose.y, pose.z + geometry.nominal_leg_length])
 
-    # Calculate leg lengths
-    leg_lengths = []
-    for i in range(num_base):
-        # Get corresponding platform point
-        platform_idx = leg_pairs[i]
-
-        # Transform platform point
-        platform_point = platform_points[platform_idx].copy()
-        platform_point[2] = geometry.nominal_leg_length
-
-        # Apply rotation and translation
-        rotated_point = R @ platform_point + translation
+    # Platform point driven by each leg, at z = 0 so it rotates about the platform
+    # center; the nominal height is carried by the translation alone
+    platform = platform_points[np.asarray(leg_pairs)]
 
-        # Calculate distance from base to transformed platform point
-        base_point_with_z = base_points[i].copy()
-        leg_length = np.linalg.norm(rotated_point - base_point_with_z)
-        leg_lengths.append(float(leg_length))
+    # Rotate and translate every platform point, then measure each leg
+    diffs = platform @ R.T + translation - base_points
+    lengths = np.sqrt(np.einsum("ij,ij->i", diffs, diffs))
+    leg_lengths = lengths.tolist()
 
     # Check validity
-    valid = all(
-        geometry.min_leg_length <= length <= geometry.max_leg_length for length in leg_lengths
+    valid = bool(
+        ((lengths >= geometry.min_leg_length) & (lengths <= geometry.max_leg_length)).all()
     )
 
     return LegLengthResponse(
@@ -8,10 +8,27 @@ from fastapi import Depends, HTTPException, Security, status
 from fastapi.security import APIKeyHeader
 
 from config import settings
+from database import lookup_api_key
 
 API_KEY_HEADER = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 
+def is_valid_api_key(api_key: str) -> bool:
+    """
+    Check a presented key against the configured key and, if enabled, the database
+
+    Database lookups are cached, so repeat requests do not hit the database.
+    """
+    if settings.api_key and api_key == settings.api_key:
+        return True
+
+    if settings.database_enabled:
+        info = lookup_api_key(api_key)
+        return info is not None and info[2]
+
+    return False
+
+
 async def verify_api_key(api_key: Optional[str] = Security(API_KEY_HEADER)) -> str:
     """
     Verify API key from request header
@@ -38,7 +55,7 @@ async def verify_api_key(api_key: Optional[str] = Security(API_KEY_HEADER)) -> s
         )
 
     # Validate API key
-    if api_key != settings.api_key:
+    if not is_valid_api_key(api_key):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API Key",
@@ -61,7 +78,7 @@ async def optional_api_key(
         return None
 
     # If key is provided, validate it
-    if api_key != settings.api_key:
+    if not is_valid_api_key(api_key):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API Key",
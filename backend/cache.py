@@ -2,18 +2,26 @@
 Caching layer using Redis for IK calculation results
 """
 
-import hashlib
-import json
+import struct
+import threading
 from functools import wraps
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional
 
+import cachetools
+import msgpack
+import orjson
 import redis
+import xxhash
 
 from config import settings
 
 # Redis client
 redis_client = None
 
+# In-process L1 cache in front of Redis for hot keys; values are shared, never mutate them
+_l1_cache = cachetools.TTLCache(maxsize=4096, ttl=60)
+_l1_lock = threading.Lock()
+
 
 def init_cache():
     """Initialize Redis connection"""
@@ -23,7 +31,8 @@ def init_cache():
         return
 
     try:
-        redis_client = redis.from_url(settings.redis_url, decode_responses=True, socket_timeout=5)
+        # Values are msgpack bytes, so keep responses undecoded
+        redis_client = redis.from_url(settings.redis_url, socket_timeout=5)
         # Test connection
         redis_client.ping()
         print(f"✓ Redis connected: {settings.redis_url}")
@@ -36,42 +45,136 @@ def init_cache():
 def generate_cache_key(prefix: str, data: dict) -> str:
     """Generate a cache key from data"""
     # Sort keys for consistent hashing
-    json_str = json.dumps(data, sort_keys=True)
-    hash_str = hashlib.md5(json_str.encode()).hexdigest()
+    hash_str = xxhash.xxh3_64_hexdigest(orjson.dumps(data, option=orjson.OPT_SORT_KEYS))
     return f"{prefix}:{hash_str}"
 
 
+# x, y, z, roll, pitch, yaw, a has-geometry flag, the five geometry fields and the
+# configuration name (all names fit in 16 bytes)
+_IK_KEY_STRUCT = struct.Struct("<6d?5d16s")
+
+
+def generate_ik_cache_key(pose: Any, default_geometry: Any) -> str:
+    """
+    Generate a cache key for an IK pose without building a dict or JSON
+
+    Args:
+        pose: PoseRequest (or any object with the same fields)
+        default_geometry: Geometry the pose is solved with when it has none of its own,
+            so results cached under an older default are not served after it changes
+
+    Returns:
+        Cache key of the form "ik:<xxh3 hex digest>"
+    """
+    geometry = pose.geometry if pose.geometry is not None else default_geometry
+    geometry_fields = (
+        geometry.base_radius,
+        geometry.platform_radius,
+        geometry.nominal_leg_length,
+        geometry.min_leg_length,
+        geometry.max_leg_length,
+    )
+
+    packed = _IK_KEY_STRUCT.pack(
+        pose.x,
+        pose.y,
+        pose.z,
+        pose.roll,
+        pose.pitch,
+        pose.yaw,
+        pose.geometry is not None,
+        *geometry_fields,
+        pose.configuration.encode(),
+    )
+    return "ik:" + xxhash.xxh3_64_hexdigest(packed)
+
+
 def get_cached(key: str) -> Optional[Any]:
     """Get value from cache"""
     if redis_client is None:
         return None
 
+    with _l1_lock:
+        value = _l1_cache.get(key)
+    if value is not None:
+        return value
+
     try:
         cached = redis_client.get(key)
         if cached:
-            return json.loads(cached)
+            value = msgpack.unpackb(cached, raw=False)
+            with _l1_lock:
+                _l1_cache[key] = value
+            return value
     except Exception as e:
         print(f"Cache get error: {e}")
 
     return None
 
 
+def get_many(keys: List[str]) -> List[Optional[Any]]:
+    """Get several values from cache in one round trip (None for misses)"""
+    if redis_client is None or not keys:
+        return [None] * len(keys)
+
+    with _l1_lock:
+        values = [_l1_cache.get(key) for key in keys]
+    missing = [i for i, value in enumerate(values) if value is None]
+    if not missing:
+        return values
+
+    try:
+        fetched = redis_client.mget([keys[i] for i in missing])
+        with _l1_lock:
+            for i, cached in zip(missing, fetched):
+                if cached:
+                    values[i] = _l1_cache[keys[i]] = msgpack.unpackb(cached, raw=False)
+    except Exception as e:
+        print(f"Cache get_many error: {e}")
+
+    return values
+
+
 def set_cached(key: str, value: Any, expiration: int = 300):
     """Set value in cache with expiration (seconds)"""
     if redis_client is None:
         return
 
+    with _l1_lock:
+        _l1_cache[key] = value
+
     try:
-        redis_client.setex(key, expiration, json.dumps(value))
+        redis_client.setex(key, expiration, msgpack.packb(value, use_bin_type=True))
     except Exception as e:
         print(f"Cache set error: {e}")
 
 
+def set_many(items: Dict[str, Any], expiration: int = 300):
+    """Set several values in cache with expiration (seconds) in one pipelined round trip"""
+    if redis_client is None or not items:
+        return
+
+    with _l1_lock:
+        _l1_cache.update(items)
+
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.setex(key, expiration, msgpack.packb(value, use_bin_type=True))
+        pipe.execute()
+    except Exception as e:
+        print(f"Cache set_many error: {e}")
+
+
 def invalidate_cache(pattern: str):
     """Invalidate all keys matching pattern"""
     if redis_client is None:
         return
 
+    # L1 entries expire quickly and patterns are rare, so drop the whole L1
+    with _l1_lock:
+        _l1_cache.clear()
+
     try:
         keys = redis_client.keys(pattern)
         if keys:
@@ -15,6 +15,7 @@ class Settings(BaseSettings):
     # Server settings
     api_host: str = Field(default="0.0.0.0", env="API_HOST")
     api_port: int = Field(default=8000, env="API_PORT")
+    api_workers: int = Field(default=1, ge=1, env="API_WORKERS")
 
     # CORS settings
     cors_origins: str = Field(
@@ -36,6 +37,12 @@ class Settings(BaseSettings):
     # Optional: Database
     database_url: str = Field(default="sqlite:///./leveling.db", env="DATABASE_URL")
     database_enabled: bool = Field(default=False, env="DATABASE_ENABLED")
+    db_pool_size: int = Field(default=10, env="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=20, env="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(default=30.0, env="DB_POOL_TIMEOUT")
+    db_pool_recycle: int = Field(default=1800, env="DB_POOL_RECYCLE")
+    api_key_usage_flush_interval: float = Field(default=5.0, env="API_KEY_USAGE_FLUSH_INTERVAL")
+    log_sampling: float = Field(default=1.0, gt=0, le=1, env="LOG_SAMPLING")
 
     # Environment
     environment: str = Field(default="development", env="ENVIRONMENT")
@@ -45,6 +52,9 @@ class Settings(BaseSettings):
     rate_limit_enabled: bool = Field(default=True, env="RATE_LIMIT_ENABLED")
     rate_limit_per_minute: int = Field(default=60, env="RATE_LIMIT_PER_MINUTE")
 
+    # Batch calculation
+    max_batch_size: int = Field(default=10000, env="MAX_BATCH_SIZE")
+
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -2,15 +2,43 @@
 Database models and connection management
 """
 
+import hashlib
+import logging
+import queue
+import secrets
+import threading
+import time
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
-from sqlalchemy import Boolean, Column, DateTime, Float, Integer, String, Text, create_engine
+import numpy as np
+from cachetools import TTLCache
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    bindparam,
+    create_engine,
+    event,
+    make_url,
+    select,
+    text,
+    update,
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from config import settings
 
+logger = logging.getLogger(__name__)
+
 Base = declarative_base()
 
 
@@ -35,9 +63,21 @@ class CalculationLog(Base):
     """Logs all IK calculations for analysis"""
 
     __tablename__ = "calculation_logs"
+    __table_args__ = (
+        # Serves "configuration = ? AND timestamp > ?" as well as configuration alone
+        Index("ix_calc_cfg_ts", "configuration", "timestamp"),
+        # Small index over failed solutions for error analysis
+        Index(
+            "ix_calc_invalid",
+            "configuration",
+            "timestamp",
+            postgresql_where=text("result_valid = false"),
+            sqlite_where=text("result_valid = 0"),
+        ),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    configuration = Column(String(50), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)  # already indexed as the primary key
+    configuration = Column(String(50), nullable=False)
     pose_x = Column(Float)
     pose_y = Column(Float)
     pose_z = Column(Float)
@@ -45,9 +85,9 @@ class CalculationLog(Base):
     pose_pitch = Column(Float)
     pose_yaw = Column(Float)
     result_valid = Column(Boolean)
-    leg_lengths = Column(Text)  # JSON string
+    leg_lengths = Column(LargeBinary)  # little-endian float32 per leg, see decode_leg_lengths
     calculation_time_ms = Column(Float)
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    timestamp = Column(DateTime, default=datetime.utcnow)
     user_agent = Column(String(200))
     ip_address = Column(String(50))
 
@@ -58,7 +98,7 @@ class APIKey(Base):
     __tablename__ = "api_keys"
 
     id = Column(Integer, primary_key=True, index=True)
-    key = Column(String(100), unique=True, index=True, nullable=False)
+    key_hash = Column(String(64), unique=True, index=True, nullable=False)  # SHA-256 hex
     name = Column(String(100), nullable=False)
     description = Column(Text)
     is_active = Column(Boolean, default=True)
@@ -67,10 +107,72 @@ class APIKey(Base):
     usage_count = Column(Integer, default=0)
 
 
+# Statements built once at import; SQLAlchemy also caches their compiled form
+_INSERT_CALCULATION_LOG = CalculationLog.__table__.insert()
+_UPDATE_API_KEY_USAGE = (
+    update(APIKey.__table__)
+    .where(APIKey.__table__.c.id == bindparam("key_id"))
+    .values(
+        last_used_at=bindparam("used_at"),
+        usage_count=APIKey.__table__.c.usage_count + bindparam("uses"),
+    )
+)
+
+
 # Database connection
 engine = None
 SessionLocal = None
 
+# Calculation logs are queued and written in batches by a background thread,
+# so callers never wait on a commit
+LOG_BATCH_SIZE = 200
+LOG_FLUSH_INTERVAL = 0.5  # seconds
+LOG_WRITE_ATTEMPTS = 5  # tries per batch before it is given up, backing off between them
+LEG_LENGTH_DTYPE = np.dtype("<f4")  # packed leg lengths, 4 bytes per leg
+_log_queue: "queue.Queue[Optional[dict]]" = queue.Queue(maxsize=10000)
+_flusher_thread: Optional[threading.Thread] = None
+
+# Valid calculations are logged at settings.log_sampling; a running credit picks
+# exactly that fraction without randomness. Invalid results are always logged.
+LOG_SAMPLING_REPORT_INTERVAL = 60.0  # seconds
+_sampling_lock = threading.Lock()
+_sample_credit = 0.0
+_sampled_logged = 0
+_sampled_seen = 0
+_sampling_report_due = 0.0
+
+# API key lookups are cached by key hash as (id, name, is_active); unknown keys
+# are cached briefly too so repeated bad keys don't each cost a query
+APIKeyInfo = Tuple[int, str, bool]
+_key_cache: TTLCache = TTLCache(maxsize=4096, ttl=60)
+_unknown_key_cache: TTLCache = TTLCache(maxsize=4096, ttl=10)
+_key_cache_lock = threading.Lock()
+
+# Pending API key usage as {id: (last used, uses)}, written by the log writer
+_key_usage: Dict[int, Tuple[datetime, int]] = {}
+_key_usage_lock = threading.Lock()
+
+
+# Applied to every new SQLite connection: WAL lets readers run alongside the log
+# writer, and NORMAL sync skips the per-commit fsync that WAL makes unnecessary
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+)
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune a new SQLite connection for frequent small inserts"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
 
 def init_db():
     """Initialize database connection and create tables"""
@@ -79,12 +181,50 @@ def init_db():
     if not settings.database_enabled:
         return
 
-    engine = create_engine(settings.database_url, connect_args={"check_same_thread": False})
+    if settings.database_url.startswith("sqlite"):
+        # An in-memory database exists only inside its one connection, so it must be
+        # shared. A file database gets a pooled connection per user instead: the log
+        # writer, key lookups and request sessions run concurrently, and one sqlite3
+        # connection is not safe to use from several threads at once.
+        in_memory = make_url(settings.database_url).database in (None, "", ":memory:")
+        engine = create_engine(
+            settings.database_url,
+            connect_args={"check_same_thread": False},
+            **({"poolclass": StaticPool} if in_memory else {}),
+        )
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+    else:
+        engine = create_engine(
+            settings.database_url,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+            pool_pre_ping=True,
+        )
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
     # Create all tables
     Base.metadata.create_all(bind=engine)
 
+    # Start the calculation log writer
+    global _flusher_thread
+    if _flusher_thread is None or not _flusher_thread.is_alive():
+        _flusher_thread = threading.Thread(
+            target=_flush_loop, name="calculation-log-writer", daemon=True
+        )
+        _flusher_thread.start()
+
+
+def close_db():
+    """Write any queued calculation logs and API key usage and stop the writer thread"""
+    global _flusher_thread
+
+    if _flusher_thread is not None:
+        _log_queue.put(None)
+        _flusher_thread.join()
+        _flusher_thread = None
+
 
 def get_db() -> Session:
     """Get database session"""
@@ -98,32 +238,251 @@ def get_db() -> Session:
         db.close()
 
 
+def decode_leg_lengths(blob: bytes) -> np.ndarray:
+    """Read the leg lengths stored in a CalculationLog row"""
+    return np.frombuffer(blob, dtype=LEG_LENGTH_DTYPE)
+
+
+def _sample_calculation(valid: bool) -> bool:
+    """Decide whether to log a calculation, reporting the sampled counts once a minute"""
+    global _sample_credit, _sampled_logged, _sampled_seen, _sampling_report_due
+
+    with _sampling_lock:
+        if valid:
+            _sample_credit += settings.log_sampling
+            keep = _sample_credit >= 1.0
+            if keep:
+                _sample_credit -= 1.0
+        else:
+            keep = True
+
+        _sampled_seen += 1
+        _sampled_logged += keep
+
+        now = time.monotonic()
+        if now >= _sampling_report_due:
+            if settings.log_sampling < 1.0 and _sampling_report_due:
+                logger.info(f"Logged {_sampled_logged} of {_sampled_seen} calculations")
+            _sampled_logged = _sampled_seen = 0
+            _sampling_report_due = now + LOG_SAMPLING_REPORT_INTERVAL
+
+    return keep
+
+
 def log_calculation(
-    db: Session,
     configuration: str,
     pose: dict,
     result: dict,
     calculation_time: float,
     request_info: Optional[dict] = None,
-):
-    """Log a calculation to the database"""
-    import json
-
-    log_entry = CalculationLog(
-        configuration=configuration,
-        pose_x=pose.get("x", 0),
-        pose_y=pose.get("y", 0),
-        pose_z=pose.get("z", 0),
-        pose_roll=pose.get("roll", 0),
-        pose_pitch=pose.get("pitch", 0),
-        pose_yaw=pose.get("yaw", 0),
-        result_valid=result.get("valid", False),
-        leg_lengths=json.dumps(result.get("leg_lengths", [])),
-        calculation_time_ms=calculation_time,
-        user_agent=request_info.get("user_agent", "") if request_info else "",
-        ip_address=request_info.get("ip", "") if request_info else "",
-    )
+) -> bool:
+    """
+    Queue a calculation to be logged to the database
+
+    Only a settings.log_sampling fraction of valid results is kept; invalid
+    results are always queued.
+
+    Returns:
+        False if the queue is full and the entry was dropped
+    """
+    if not _sample_calculation(result.get("valid", False)):
+        return True
+
+    row = {
+        "configuration": configuration,
+        "pose_x": pose.get("x", 0),
+        "pose_y": pose.get("y", 0),
+        "pose_z": pose.get("z", 0),
+        "pose_roll": pose.get("roll", 0),
+        "pose_pitch": pose.get("pitch", 0),
+        "pose_yaw": pose.get("yaw", 0),
+        "result_valid": result.get("valid", False),
+        "leg_lengths": np.asarray(result.get("leg_lengths", []), dtype=LEG_LENGTH_DTYPE).tobytes(),
+        "calculation_time_ms": calculation_time,
+        "timestamp": datetime.utcnow(),
+        "user_agent": request_info.get("user_agent", "") if request_info else "",
+        "ip_address": request_info.get("ip", "") if request_info else "",
+    }
+
+    try:
+        _log_queue.put_nowait(row)
+    except queue.Full:
+        return False
+    return True
+
+
+def hash_api_key(key: str) -> str:
+    """
+    Hash an API key for storage and lookup
+
+    Keys are random tokens, so a single SHA-256 is enough to make stored keys
+    unrecoverable without a slow password hash on every request.
+    """
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def create_api_key(name: str, description: Optional[str] = None) -> Tuple[str, APIKeyInfo]:
+    """
+    Create and store a new API key
+
+    Only the key's hash is stored, so the returned key cannot be shown again.
+
+    Args:
+        name: Name of the client the key is for
+        description: Optional free-form description
+
+    Returns:
+        Tuple of (the new key, its (id, name, is_active) record)
+    """
+    if SessionLocal is None:
+        raise RuntimeError("Database not initialized. Call init_db() first.")
+
+    key = secrets.token_urlsafe(32)
+    key_hash = hash_api_key(key)
+
+    db = SessionLocal()
+    try:
+        api_key = APIKey(key_hash=key_hash, name=name, description=description, is_active=True)
+        db.add(api_key)
+        db.commit()
+        info = (api_key.id, api_key.name, True)
+    finally:
+        db.close()
+
+    # Pre-warm the cache so the key's first request skips the database
+    with _key_cache_lock:
+        _key_cache[key_hash] = info
+        _unknown_key_cache.pop(key_hash, None)
+
+    return key, info
+
+
+def lookup_api_key(key: str) -> Optional[APIKeyInfo]:
+    """
+    Look up an API key, recording its use if it is active
+
+    Args:
+        key: API key as presented by the client
+
+    Returns:
+        (id, name, is_active) for a stored key, None for unknown keys
+    """
+    if engine is None:
+        return None
+
+    key_hash = hash_api_key(key)
+    with _key_cache_lock:
+        info = _key_cache.get(key_hash)
+        if info is None and key_hash in _unknown_key_cache:
+            return None
+
+    if info is None:
+        table = APIKey.__table__
+        with engine.connect() as conn:
+            row = conn.execute(
+                select(table.c.id, table.c.name, table.c.is_active).where(
+                    table.c.key_hash == key_hash
+                )
+            ).first()
+
+        with _key_cache_lock:
+            if row is None:
+                _unknown_key_cache[key_hash] = True
+                return None
+            info = _key_cache[key_hash] = (row.id, row.name, bool(row.is_active))
+
+    if info[2]:
+        now = datetime.utcnow()
+        with _key_usage_lock:
+            _, uses = _key_usage.get(info[0], (now, 0))
+            _key_usage[info[0]] = (now, uses + 1)
+
+    return info
+
+
+def invalidate_api_key(key: str):
+    """Drop a key from the lookup caches after it is created, changed or removed"""
+    key_hash = hash_api_key(key)
+    with _key_cache_lock:
+        _key_cache.pop(key_hash, None)
+        _unknown_key_cache.pop(key_hash, None)
+
+
+def _write_api_key_usage():
+    """Apply pending API key usage with one executemany UPDATE"""
+    global _key_usage
+
+    with _key_usage_lock:
+        if not _key_usage:
+            return
+        pending, _key_usage = _key_usage, {}
+
+    try:
+        with engine.begin() as conn:
+            conn.execute(
+                _UPDATE_API_KEY_USAGE,
+                [
+                    {"key_id": key_id, "used_at": used_at, "uses": uses}
+                    for key_id, (used_at, uses) in pending.items()
+                ],
+            )
+    except Exception as e:
+        logger.error(f"Failed to record usage for {len(pending)} API keys: {e!r}")
+
+
+def _write_calculation_logs(rows: List[dict]) -> bool:
+    """
+    Insert calculation log rows with one executemany and one commit
+
+    A failed batch is retried up to LOG_WRITE_ATTEMPTS times, so a transient
+    error such as a locked database does not lose it.
+
+    Returns:
+        False if every attempt failed and the rows were dropped
+    """
+    for attempt in range(1, LOG_WRITE_ATTEMPTS + 1):
+        try:
+            with engine.begin() as conn:
+                conn.execute(_INSERT_CALCULATION_LOG, rows)
+            return True
+        except Exception as e:
+            if attempt == LOG_WRITE_ATTEMPTS:
+                logger.error(
+                    f"Dropped {len(rows)} calculation logs after {attempt} attempts: {e!r}"
+                )
+                return False
+            logger.warning(f"Failed to write {len(rows)} calculation logs, retrying: {e!r}")
+            time.sleep(LOG_FLUSH_INTERVAL * attempt)
+    return False
+
+
+def _flush_loop():
+    """
+    Drain the log queue, writing up to LOG_BATCH_SIZE rows per LOG_FLUSH_INTERVAL
+
+    Pending API key usage is written every api_key_usage_flush_interval seconds
+    and once more on shutdown.
+    """
+    usage_due = time.monotonic() + settings.api_key_usage_flush_interval
+    stop = False
+    while not stop:
+        rows: List[dict] = []
+        deadline = time.monotonic() + LOG_FLUSH_INTERVAL
+        while len(rows) < LOG_BATCH_SIZE:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                row = _log_queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if row is None:
+                stop = True
+                break
+            rows.append(row)
 
-    db.add(log_entry)
-    db.commit()
-    return log_entry
+        if rows:
+            _write_calculation_logs(rows)
+        if stop or time.monotonic() >= usage_due:
+            _write_api_key_usage()
+            usage_due = time.monotonic() + settings.api_key_usage_flush_interval
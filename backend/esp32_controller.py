@@ -3,27 +3,54 @@ ESP32 Controller Simulator
 Simulates the ESP32 microcontroller communication protocol and control logic
 """
 
+import asyncio
 import struct
 import threading
 import time
-from dataclasses import dataclass
-from typing import Callable, Optional
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
 
 import numpy as np
 import serial
 
+# Precompiled packet layouts: [START_BYTE][COMMAND][LENGTH] header, single bytes and floats
+_HEADER = struct.Struct("BBB")
+_BYTE = struct.Struct("B")
+_FLOAT = struct.Struct("f")
+
+
+@lru_cache(maxsize=None)
+def _floats(n: int) -> struct.Struct:
+    """Compiled layout for n float32 values, e.g. one target per actuator"""
+    return struct.Struct(f"{n}f")
+
+
+def _actuator_field(name: str, doc: str) -> property:
+    """Property reading and writing one actuator's element of a controller state array"""
+
+    def fget(self):
+        return getattr(self._controller, name)[self._index].item()
+
+    def fset(self, value):
+        getattr(self._controller, name)[self._index] = value
+
+    return property(fget, fset, doc=doc)
+
 
-@dataclass
 class ActuatorState:
-    """State of a single actuator"""
+    """View of a single actuator's state inside the controller's state arrays"""
 
-    position: float  # Current position in mm
-    target: float  # Target position in mm
-    speed: float  # Movement speed in mm/s
-    current: float  # Current draw in amps
-    limit_min: bool  # Min limit switch triggered
-    limit_max: bool  # Max limit switch triggered
-    enabled: bool  # Actuator enabled
+    def __init__(self, controller: "ESP32Controller", index: int):
+        self._controller = controller
+        self._index = index
+
+    position = _actuator_field("_position", "Current position in mm")
+    target = _actuator_field("_target", "Target position in mm")
+    speed = _actuator_field("_speed", "Movement speed in mm/s")
+    current = _actuator_field("_current", "Current draw in amps")
+    limit_min = _actuator_field("_limit_min", "Min limit switch triggered")
+    limit_max = _actuator_field("_limit_max", "Max limit switch triggered")
+    enabled = _actuator_field("_enabled", "Actuator enabled")
 
 
 class ESP32Controller:
@@ -70,20 +97,15 @@ class ESP32Controller:
         self.min_position = min_position_mm
         self.max_position = max_position_mm
 
-        # Initialize actuator states
-        self.actuators = []
-        for i in range(num_actuators):
-            self.actuators.append(
-                ActuatorState(
-                    position=min_position_mm,
-                    target=min_position_mm,
-                    speed=20.0,  # mm/s default
-                    current=0.0,
-                    limit_min=True,
-                    limit_max=False,
-                    enabled=False,
-                )
-            )
+        # Actuator state, one array element per actuator so a tick updates them all at once
+        self._position = np.full(num_actuators, float(min_position_mm))
+        self._target = np.full(num_actuators, float(min_position_mm))
+        self._speed = np.full(num_actuators, 20.0)  # mm/s default
+        self._current = np.zeros(num_actuators)
+        self._limit_min = np.ones(num_actuators, dtype=bool)
+        self._limit_max = np.zeros(num_actuators, dtype=bool)
+        self._enabled = np.zeros(num_actuators, dtype=bool)
+        self.actuators: List[ActuatorState] = [ActuatorState(self, i) for i in range(num_actuators)]
 
         # Control state
         self.emergency_stop = False
@@ -93,20 +115,34 @@ class ESP32Controller:
         self.update_rate = 50  # Hz
         self.running = False
         self.thread: Optional[threading.Thread] = None
+        self.task: Optional[asyncio.Task] = None
 
-        # Callbacks for external monitoring
+        # Callbacks for external monitoring; position_callback gets a read-only view of
+        # the live positions, and only once some actuator has moved past the threshold
         self.position_callback: Optional[Callable] = None
+        self.position_callback_threshold = 0.05  # mm
+        self._positions_view = memoryview(self._position).toreadonly()
+        self._callback_positions = np.full(num_actuators, np.inf)
 
         print(f"ESP32 Controller initialized:")
         print(f"  Actuators: {num_actuators}")
         print(f"  Stroke: {stroke_mm}mm")
         print(f"  Range: {min_position_mm}mm - {max_position_mm}mm")
 
-    def start(self):
-        """Start the controller simulation"""
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """
+        Start the controller simulation
+
+        Args:
+            loop: Run the control loop as a task on this event loop instead of
+                in a background thread (call from the loop's own thread)
+        """
         self.running = True
-        self.thread = threading.Thread(target=self._control_loop, daemon=True)
-        self.thread.start()
+        if loop is not None:
+            self.task = loop.create_task(self._control_loop_async())
+        else:
+            self.thread = threading.Thread(target=self._control_loop, daemon=True)
+            self.thread.start()
         print("Controller started")
 
     def stop(self):
@@ -114,89 +150,115 @@ class ESP32Controller:
         self.running = False
         if self.thread:
             self.thread.join()
+        if self.task:
+            self.task.cancel()
+            self.task = None
         print("Controller stopped")
 
+    def _tick(self, dt: float):
+        """Advance the simulation by one control period"""
+        if not self.emergency_stop:
+            self._update_actuators(dt)
+
+        # Call position callback if registered and something moved
+        callback = self.position_callback
+        if (
+            callback is not None
+            and (
+                np.abs(self._position - self._callback_positions) > self.position_callback_threshold
+            ).any()
+        ):
+            self._callback_positions[:] = self._position
+            callback(self._positions_view)
+
+    def _next_deadline(self, deadline: int, period_ns: int) -> int:
+        """Advance a tick deadline, resyncing instead of bursting when a tick behind"""
+        now = time.monotonic_ns()
+        if now - deadline > period_ns:
+            print(f"Warning: control loop overran by {(now - deadline) / 1e6:.1f}ms")
+            return now + period_ns
+        return deadline + period_ns
+
     def _control_loop(self):
         """Main control loop (runs in background thread)"""
         dt = 1.0 / self.update_rate
+        period_ns = int(1e9 / self.update_rate)
+
+        # Ticks are scheduled on fixed monotonic deadlines, so sleep overshoot
+        # and wall-clock jumps don't accumulate into drift
+        deadline = time.monotonic_ns() + period_ns
 
         while self.running:
-            start_time = time.time()
-
-            if not self.emergency_stop:
-                # Update each actuator
-                for actuator in self.actuators:
-                    if actuator.enabled:
-                        self._update_actuator(actuator, dt)
-
-            # Call position callback if registered
-            if self.position_callback:
-                positions = [a.position for a in self.actuators]
-                self.position_callback(positions)
-
-            # Sleep to maintain update rate
-            elapsed = time.time() - start_time
-            sleep_time = max(0, dt - elapsed)
-            time.sleep(sleep_time)
-
-    def _update_actuator(self, actuator: ActuatorState, dt: float):
-        """Update single actuator position"""
-        # Calculate position error
-        error = actuator.target - actuator.position
-
-        if abs(error) < 0.5:  # Within 0.5mm is close enough
+            self._tick(dt)
+
+            # Sleep until the next tick
+            slack_ns = deadline - time.monotonic_ns()
+            if slack_ns > 0:
+                time.sleep(slack_ns / 1e9)
+            deadline = self._next_deadline(deadline, period_ns)
+
+    async def _control_loop_async(self):
+        """Main control loop as an event loop task, sharing the application's loop"""
+        dt = 1.0 / self.update_rate
+        period_ns = int(1e9 / self.update_rate)
+        deadline = time.monotonic_ns() + period_ns
+
+        while self.running:
+            self._tick(dt)
+
+            slack_ns = deadline - time.monotonic_ns()
+            if slack_ns > 0:
+                await asyncio.sleep(slack_ns / 1e9)
+            deadline = self._next_deadline(deadline, period_ns)
+
+    def _update_actuators(self, dt: float):
+        """Update the positions of all enabled actuators"""
+        # Calculate position errors; within 0.5mm is close enough
+        error = self._target - self._position
+        moving = self._enabled & (np.abs(error) >= 0.5)
+        if not moving.any():
             return
 
         # Calculate movement
-        max_movement = actuator.speed * dt
+        max_movement = self._speed * dt
         movement = np.clip(error, -max_movement, max_movement)
 
-        # Update position
-        new_position = actuator.position + movement
-
-        # Check limits
-        if new_position <= self.min_position:
-            new_position = self.min_position
-            actuator.limit_min = True
-        else:
-            actuator.limit_min = False
-
-        if new_position >= self.max_position:
-            new_position = self.max_position
-            actuator.limit_max = True
-        else:
-            actuator.limit_max = False
+        # Update positions, clamped at the limits
+        new_position = self._position + movement
+        limit_min = new_position <= self.min_position
+        new_position[limit_min] = self.min_position
+        limit_max = new_position >= self.max_position
+        new_position[limit_max] = self.max_position
 
-        actuator.position = new_position
+        # Simulate current draw (proportional to speed and load), else holding current
+        magnitude = np.abs(movement)
+        current = np.where(magnitude > 0.1, 0.5 + magnitude * 0.1, 0.1)
 
-        # Simulate current draw (proportional to speed and load)
-        if abs(movement) > 0.1:
-            actuator.current = 0.5 + abs(movement) * 0.1  # Simplified model
-        else:
-            actuator.current = 0.1  # Holding current
+        np.copyto(self._position, new_position, where=moving)
+        np.copyto(self._limit_min, limit_min, where=moving)
+        np.copyto(self._limit_max, limit_max, where=moving)
+        np.copyto(self._current, current, where=moving)
 
     def set_targets(self, targets_mm: list):
         """
         Set target positions for all actuators
 
         Args:
-            targets_mm: List of target positions in mm
+            targets_mm: Sequence or array of target positions in mm
         """
         if len(targets_mm) != self.num_actuators:
             raise ValueError(f"Expected {self.num_actuators} targets, got {len(targets_mm)}")
 
-        for i, target in enumerate(targets_mm):
-            # Clamp target to valid range
-            clamped = np.clip(target, self.min_position, self.max_position)
-            self.actuators[i].target = clamped
+        # Clamp targets to valid range, straight into the target array
+        targets = np.asarray(targets_mm, dtype=float)
+        clamped = np.clip(targets, self.min_position, self.max_position, out=self._target)
 
-            if clamped != target:
-                print(f"Warning: Target {i} clamped from {target:.1f} to {clamped:.1f}mm")
+        for i in np.flatnonzero(clamped != targets):
+            print(f"Warning: Target {i} clamped from {targets[i]:.1f} to {clamped[i]:.1f}mm")
 
     def enable_actuators(self, enable: bool = True):
         """Enable or disable all actuators"""
-        for actuator in self.actuators:
-            actuator.enabled = enable
+        self._enabled[:] = enable
 
         status = "enabled" if enable else "disabled"
         print(f"All actuators {status}")
@@ -214,17 +276,17 @@ class ESP32Controller:
 
     def get_positions(self) -> list:
         """Get current positions of all actuators"""
-        return [a.position for a in self.actuators]
+        return self._position.tolist()
 
     def get_status(self) -> dict:
         """Get complete status of all actuators"""
         return {
-            "positions": [a.position for a in self.actuators],
-            "targets": [a.target for a in self.actuators],
-            "currents": [a.current for a in self.actuators],
-            "enabled": [a.enabled for a in self.actuators],
-            "limit_min": [a.limit_min for a in self.actuators],
-            "limit_max": [a.limit_max for a in self.actuators],
+            "positions": self._position.tolist(),
+            "targets": self._target.tolist(),
+            "currents": self._current.tolist(),
+            "enabled": self._enabled.tolist(),
+            "limit_min": self._limit_min.tolist(),
+            "limit_max": self._limit_max.tolist(),
             "emergency_stop": self.emergency_stop,
             "calibrated": self.calibrated,
         }
@@ -235,7 +297,7 @@ class ESP32Controller:
 
         # Move all actuators to minimum position
         self.enable_actuators(True)
-        home_positions = [self.min_position] * self.num_actuators
+        home_positions = np.full(self.num_actuators, float(self.min_position))
         self.set_targets(home_positions)
 
         # Wait for movement to complete
@@ -243,10 +305,7 @@ class ESP32Controller:
         start_time = time.time()
 
         while time.time() - start_time < max_wait:
-            positions = self.get_positions()
-            errors = [abs(p - t) for p, t in zip(positions, home_positions)]
-
-            if all(e < 1.0 for e in errors):  # Within 1mm
+            if (np.abs(self._position - home_positions) < 1.0).all():  # Within 1mm
                 break
 
             time.sleep(0.1)
@@ -256,8 +315,7 @@ class ESP32Controller:
 
     def set_speed(self, speed_mm_s: float):
         """Set movement speed for all actuators"""
-        for actuator in self.actuators:
-            actuator.speed = speed_mm_s
+        self._speed[:] = speed_mm_s
         print(f"Speed set to {speed_mm_s} mm/s")
 
 
@@ -277,6 +335,15 @@ class SerialProtocol:
         self.baudrate = baudrate
         self.serial_conn: Optional[serial.Serial] = None
 
+        # Simulated command handlers, keyed by command byte
+        self._dispatch: Dict[int, Callable[[bytes], None]] = {
+            ESP32Controller.CMD_SET_TARGET: self._on_set_target,
+            ESP32Controller.CMD_ENABLE: self._on_enable,
+            ESP32Controller.CMD_EMERGENCY_STOP: lambda data: controller.emergency_stop_trigger(),
+            ESP32Controller.CMD_CALIBRATE: lambda data: controller.calibrate(),
+            ESP32Controller.CMD_SET_SPEED: self._on_set_speed,
+        }
+
     def connect(self, simulated: bool = True):
         """Connect to ESP32 (or simulate connection)"""
         if simulated:
@@ -291,39 +358,47 @@ class SerialProtocol:
             print(f"Failed to connect: {e}")
             return False
 
-    def send_command(self, command: int, data: bytes = b""):
-        """Send command to ESP32"""
+    def send_command(self, command: int, data: bytes = b"") -> Optional[int]:
+        """
+        Send command to ESP32
+
+        data may be any bytes-like object; it is only read during the call, so
+        callers can reuse one buffer across commands
+
+        Returns:
+            In simulated mode, RESP_ACK or RESP_ERROR for unknown commands
+        """
         if self.serial_conn:
             # Binary protocol: [START_BYTE][COMMAND][LENGTH][DATA][CHECKSUM]
-            packet = struct.pack("BBB", 0xAA, command, len(data)) + data
-            checksum = sum(packet) & 0xFF
-            packet += struct.pack("B", checksum)
+            packet = bytearray(_HEADER.size + len(data) + 1)
+            _HEADER.pack_into(packet, 0, 0xAA, command, len(data))
+            packet[_HEADER.size : -1] = data
+            packet[-1] = sum(memoryview(packet)[:-1]) & 0xFF
             self.serial_conn.write(packet)
-        else:
-            # Simulated mode - execute directly
-            self._execute_command(command, data)
+            return None
 
-    def _execute_command(self, command: int, data: bytes):
-        """Execute command directly (simulation mode)"""
-        if command == ESP32Controller.CMD_SET_TARGET:
-            # Data format: float32 for each actuator
-            num_actuators = len(data) // 4
-            targets = struct.unpack(f"{num_actuators}f", data)
-            self.controller.set_targets(list(targets))
+        # Simulated mode - execute directly
+        return self._execute_command(command, data)
 
-        elif command == ESP32Controller.CMD_ENABLE:
-            enable = struct.unpack("B", data)[0] == 1
-            self.controller.enable_actuators(enable)
-
-        elif command == ESP32Controller.CMD_EMERGENCY_STOP:
-            self.controller.emergency_stop_trigger()
-
-        elif command == ESP32Controller.CMD_CALIBRATE:
-            self.controller.calibrate()
-
-        elif command == ESP32Controller.CMD_SET_SPEED:
-            speed = struct.unpack("f", data)[0]
-            self.controller.set_speed(speed)
+    def _execute_command(self, command: int, data: bytes) -> int:
+        """Execute command directly (simulation mode)"""
+        handler = self._dispatch.get(command)
+        if handler is None:
+            return ESP32Controller.RESP_ERROR
+        handler(data)
+        return ESP32Controller.RESP_ACK
+
+    def _on_set_target(self, data: bytes):
+        """Data format: float32 for each actuator"""
+        self.controller.set_targets(_floats(len(data) // 4).unpack_from(data))
+
+    def _on_enable(self, data: bytes):
+        """Data format: one byte, 1 to enable"""
+        self.controller.enable_actuators(_BYTE.unpack_from(data)[0] == 1)
+
+    def _on_set_speed(self, data: bytes):
+        """Data format: float32 speed in mm/s"""
+        self.controller.set_speed(_FLOAT.unpack_from(data)[0])
 
 
 # Test/demo
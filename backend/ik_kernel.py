@@ -0,0 +1,327 @@
+"""
+Compiled inverse kinematics kernels
+Numba nopython implementations of the per-request IK math used by the API
+"""
+
+import math
+from functools import lru_cache
+from typing import Tuple
+
+import numba as nb
+import numpy as np
+from numba import types
+
+# Geometry arrays are cached and handed out read-only, so accept either flavour.
+# Points are stored as float32 (3, N) rows of xs, ys, zs; math runs in float64.
+_POINTS = types.Array(types.float32, 2, "A", readonly=True)
+_INDICES = types.Array(types.intp, 1, "A", readonly=True)
+
+# fastmath lets LLVM contract the multiply-add chains into FMAs; bounds checks and
+# Python-style float error checks are off since every index comes from leg_pairs
+_JIT_OPTIONS = dict(cache=True, fastmath=True, nogil=True, boundscheck=False, error_model="numpy")
+
+
+@nb.njit(inline="always", **_JIT_OPTIONS)
+def rotation_zyx(roll, pitch, yaw):
+    """
+    Closed-form ZYX Euler rotation R = Rz @ Ry @ Rx (angles in radians)
+
+    Returns the nine entries in row-major order as scalars so callers keep
+    them in registers instead of allocating a 3x3 array.
+    """
+    sr = math.sin(roll)
+    cr = math.cos(roll)
+    sp = math.sin(pitch)
+    cp = math.cos(pitch)
+    sy = math.sin(yaw)
+    cy = math.cos(yaw)
+
+    return (
+        cy * cp,
+        cy * sp * sr - sy * cr,
+        cy * sp * cr + sy * sr,
+        sy * cp,
+        sy * sp * sr + cy * cr,
+        sy * sp * cr - cy * sr,
+        -sp,
+        cp * sr,
+        cp * cr,
+    )
+
+
+_POSE_ARGS = (_POINTS, _POINTS, _INDICES) + (types.float64,) * 8
+
+
+@nb.njit(
+    types.boolean(*_POSE_ARGS, types.float64[::1]),
+    **_JIT_OPTIONS,
+)
+def ik_kernel_into(
+    base_pts, plat_pts, leg_pairs, roll, pitch, yaw, tx, ty, tz, min_len, max_len, out
+):
+    """
+    Calculate leg lengths for a single pose into a caller-owned buffer
+
+    Rotation, translation, norm and the limit check are fused into one pass
+    per leg, so no intermediate arrays are created.
+
+    Args:
+        base_pts: (3, N) base attachment points (rows of xs, ys, zs)
+        plat_pts: (3, M) platform attachment points relative to the platform center
+            at z = 0; the platform height is supplied in tz
+        leg_pairs: (N,) platform point index driven by each leg
+        roll, pitch, yaw: Rotation angles in radians
+        tx, ty, tz: Platform translation in mm
+        min_len, max_len: Allowed leg length range in mm
+        out: Buffer of at least N elements; the first N receive the leg lengths
+
+    Returns:
+        Whether all leg lengths are within limits
+    """
+    r00, r01, r02, r10, r11, r12, r20, r21, r22 = rotation_zyx(roll, pitch, yaw)
+
+    valid = True
+    for i in range(base_pts.shape[1]):
+        idx = leg_pairs[i]
+        px = np.float64(plat_pts[0, idx])
+        py = np.float64(plat_pts[1, idx])
+        pz = np.float64(plat_pts[2, idx])
+
+        dx = r00 * px + r01 * py + r02 * pz + tx - base_pts[0, i]
+        dy = r10 * px + r11 * py + r12 * pz + ty - base_pts[1, i]
+        dz = r20 * px + r21 * py + r22 * pz + tz - base_pts[2, i]
+        length = math.sqrt(dx * dx + dy * dy + dz * dz)
+        out[i] = length
+        if length < min_len or length > max_len:
+            valid = False
+
+    return valid
+
+
+@lru_cache(maxsize=None)
+def make_ik_kernel(leg_pairs: Tuple[int, ...]):
+    """
+    Build an ik_kernel_into specialized for one fixed leg_pairs layout
+
+    The leg count and platform indices are compile-time constants of the
+    returned kernel, so LLVM can fully unroll the leg loop. Kernels are
+    memoized per layout, and Numba's on-disk cache keys on the constants.
+
+    Args:
+        leg_pairs: Platform point index driven by each leg
+
+    Returns:
+        Compiled kernel taking ik_kernel_into's arguments without leg_pairs
+    """
+    num_legs = len(leg_pairs)
+
+    @nb.njit(
+        types.boolean(_POINTS, _POINTS, *(types.float64,) * 8, types.float64[::1]),
+        **_JIT_OPTIONS,
+    )
+    def kernel(base_pts, plat_pts, roll, pitch, yaw, tx, ty, tz, min_len, max_len, out):
+        r00, r01, r02, r10, r11, r12, r20, r21, r22 = rotation_zyx(roll, pitch, yaw)
+
+        valid = True
+        for i in range(num_legs):
+            idx = leg_pairs[i]
+            px = np.float64(plat_pts[0, idx])
+            py = np.float64(plat_pts[1, idx])
+            pz = np.float64(plat_pts[2, idx])
+
+            dx = r00 * px + r01 * py + r02 * pz + tx - base_pts[0, i]
+            dy = r10 * px + r11 * py + r12 * pz + ty - base_pts[1, i]
+            dz = r20 * px + r21 * py + r22 * pz + tz - base_pts[2, i]
+            length = math.sqrt(dx * dx + dy * dy + dz * dz)
+            out[i] = length
+            if length < min_len or length > max_len:
+                valid = False
+
+        return valid
+
+    return kernel
+
+
+@nb.njit(
+    types.Tuple((types.float64[::1], types.boolean))(*_POSE_ARGS),
+    **_JIT_OPTIONS,
+)
+def ik_kernel(base_pts, plat_pts, leg_pairs, roll, pitch, yaw, tx, ty, tz, min_len, max_len):
+    """
+    Calculate leg lengths for a single pose and check them against the limits
+
+    Same arguments as ik_kernel_into, but allocates and returns the lengths.
+
+    Returns:
+        Tuple of ((N,) array of leg lengths in mm, whether all are within limits)
+    """
+    lengths = np.empty(base_pts.shape[1], dtype=np.float64)
+    valid = ik_kernel_into(
+        base_pts, plat_pts, leg_pairs, roll, pitch, yaw, tx, ty, tz, min_len, max_len, lengths
+    )
+    return lengths, valid
+
+
+@nb.njit(
+    types.Tuple((types.float64[:, ::1], types.boolean[::1]))(
+        _POINTS,
+        _POINTS,
+        _INDICES,
+        types.Array(types.float64, 2, "C", readonly=True),
+        types.Array(types.float64, 2, "C", readonly=True),
+        types.float64,
+        types.float64,
+    ),
+    **_JIT_OPTIONS,
+    parallel=True,
+)
+def ik_batch_kernel(base_pts, plat_pts, leg_pairs, angles, translations, min_len, max_len):
+    """
+    Calculate leg lengths for a batch of poses sharing one geometry
+
+    Poses are independent, so the batch dimension is split across threads
+    with prange; each pose writes only its own row.
+
+    Args:
+        base_pts: (3, N) base attachment points (rows of xs, ys, zs)
+        plat_pts: (3, M) platform attachment points relative to the platform center
+            at z = 0; the platform height is supplied in translations
+        leg_pairs: (N,) platform point index driven by each leg
+        angles: (B, 3) roll, pitch, yaw in radians
+        translations: (B, 3) platform translation in mm
+        min_len, max_len: Allowed leg length range in mm
+
+    Returns:
+        Tuple of ((B, N) leg lengths in mm, (B,) whether each pose is within limits)
+    """
+    batch = angles.shape[0]
+    lengths = np.empty((batch, base_pts.shape[1]), dtype=np.float64)
+    valid = np.empty(batch, dtype=np.bool_)
+    for b in nb.prange(batch):
+        valid[b] = ik_kernel_into(
+            base_pts,
+            plat_pts,
+            leg_pairs,
+            angles[b, 0],
+            angles[b, 1],
+            angles[b, 2],
+            translations[b, 0],
+            translations[b, 1],
+            translations[b, 2],
+            min_len,
+            max_len,
+            lengths[b],
+        )
+    return lengths, valid
+
+
+_POINTS64 = types.Array(types.float64, 2, "C", readonly=True)
+_SOLVE_ARGS = (_POINTS64, _POINTS64) + (types.float64,) * 9
+
+
+@nb.njit(types.boolean(*_SOLVE_ARGS, types.float64[::1]), **_JIT_OPTIONS)
+def solve_points_into(
+    base_pts, local_pts, pivot_dz, roll, pitch, yaw, tx, ty, tz, min_len, max_len, out
+):
+    """
+    Calculate leg lengths for the float64 geometry used by TripodIK and StewartPlatformIK
+
+    Points are (3, N) rows of xs, ys, zs like the API kernels, so each
+    coordinate is read contiguously across legs.
+
+    Args:
+        base_pts: (3, N) base attachment points
+        local_pts: (3, N) platform attachment points relative to the level pivot
+        pivot_dz: Height of the rotation pivot above the level pivot
+        roll, pitch, yaw: Rotation angles in radians
+        tx, ty, tz: Pivot position after the move
+        min_len, max_len: Allowed leg length range
+        out: (N,) buffer receiving the leg lengths
+
+    Returns:
+        Whether all leg lengths are within limits
+    """
+    r00, r01, r02, r10, r11, r12, r20, r21, r22 = rotation_zyx(roll, pitch, yaw)
+
+    valid = True
+    for i in range(base_pts.shape[1]):
+        px = local_pts[0, i]
+        py = local_pts[1, i]
+        pz = local_pts[2, i] - pivot_dz
+
+        dx = r00 * px + r01 * py + r02 * pz + tx - base_pts[0, i]
+        dy = r10 * px + r11 * py + r12 * pz + ty - base_pts[1, i]
+        dz = r20 * px + r21 * py + r22 * pz + tz - base_pts[2, i]
+        length = math.sqrt(dx * dx + dy * dy + dz * dz)
+        out[i] = length
+        if length < min_len or length > max_len:
+            valid = False
+
+    return valid
+
+
+@nb.njit(types.Tuple((types.float64[::1], types.boolean))(*_SOLVE_ARGS), **_JIT_OPTIONS)
+def solve_points_kernel(
+    base_pts, local_pts, pivot_dz, roll, pitch, yaw, tx, ty, tz, min_len, max_len
+):
+    """
+    Calculate leg lengths for a single pose
+
+    Same arguments as solve_points_into, but allocates and returns the lengths.
+
+    Returns:
+        Tuple of ((N,) array of leg lengths, whether all are within limits)
+    """
+    lengths = np.empty(base_pts.shape[1], dtype=np.float64)
+    valid = solve_points_into(
+        base_pts, local_pts, pivot_dz, roll, pitch, yaw, tx, ty, tz, min_len, max_len, lengths
+    )
+    return lengths, valid
+
+
+@nb.njit(
+    types.Tuple((types.float64[:, ::1], types.boolean[::1]))(
+        _POINTS64,
+        _POINTS64,
+        types.float64,
+        types.Array(types.float64, 2, "C", readonly=True),
+        types.Array(types.float64, 2, "C", readonly=True),
+        types.float64,
+        types.float64,
+    ),
+    **_JIT_OPTIONS,
+)
+def solve_points_batch_kernel(base_pts, local_pts, pivot_dz, angles, positions, min_len, max_len):
+    """
+    Calculate leg lengths for a batch of poses sharing one geometry
+
+    Args:
+        base_pts: (3, N) base attachment points
+        local_pts: (3, N) platform attachment points relative to the level pivot
+        pivot_dz: Height of the rotation pivot above the level pivot
+        angles: (B, 3) roll, pitch, yaw in radians
+        positions: (B, 3) pivot position after each move
+        min_len, max_len: Allowed leg length range
+
+    Returns:
+        Tuple of ((B, N) leg lengths, (B,) whether each pose is within limits)
+    """
+    batch = angles.shape[0]
+    lengths = np.empty((batch, base_pts.shape[1]), dtype=np.float64)
+    valid = np.empty(batch, dtype=np.bool_)
+    for b in range(batch):
+        valid[b] = solve_points_into(
+            base_pts,
+            local_pts,
+            pivot_dz,
+            angles[b, 0],
+            angles[b, 1],
+            angles[b, 2],
+            positions[b, 0],
+            positions[b, 1],
+            positions[b, 2],
+            min_len,
+            max_len,
+            lengths[b],
+        )
+    return lengths, valid
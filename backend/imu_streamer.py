@@ -10,29 +10,58 @@ Example apps:
 - Send to computer's IP on port 5555
 """
 
-import json
+import asyncio
+import math
+import select
 import socket
 import struct
 import threading
 import time
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Union
 
 import numpy as np
+import orjson
 
+# Binary packets: roll, pitch, yaw as three float32 radians
+_BINARY_ANGLES = struct.Struct("fff")
 
-@dataclass
+
+@dataclass(frozen=True)
 class IMUData:
-    """Container for IMU orientation data"""
+    """
+    Container for IMU orientation data
+
+    Frozen, so a published sample is never modified; the receiver publishes
+    each new sample with a single reference assignment.
+    """
 
     roll: float  # degrees, rotation about X axis
     pitch: float  # degrees, rotation about Y axis
     yaw: float  # degrees, rotation about Z axis
     timestamp: float
+    tilt_magnitude: float = field(init=False)  # degrees, combined roll and pitch
+
+    def __post_init__(self):
+        # Computed once per sample rather than by every reader
+        object.__setattr__(self, "tilt_magnitude", math.hypot(self.roll, self.pitch))
 
     def to_radians(self):
         """Convert angles to radians"""
-        return np.array([np.deg2rad(self.roll), np.deg2rad(self.pitch), np.deg2rad(self.yaw)])
+        return np.array((math.radians(self.roll), math.radians(self.pitch), math.radians(self.yaw)))
+
+
+class _IMUProtocol(asyncio.DatagramProtocol):
+    """Hands datagrams received on the event loop to an IMUStreamer"""
+
+    def __init__(self, streamer: "IMUStreamer"):
+        self.streamer = streamer
+
+    def datagram_received(self, data: bytes, addr):
+        self.streamer._parse_data(data)
+
+    def error_received(self, exc: Exception):
+        print(f"Error receiving data: {exc}")
 
 
 class IMUStreamer:
@@ -44,11 +73,15 @@ class IMUStreamer:
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.socket.bind((self.host, self.port))
-        self.socket.settimeout(0.1)  # Non-blocking with timeout
+        self.socket.setblocking(False)
 
         self.latest_data: Optional[IMUData] = None
         self.running = False
         self.thread: Optional[threading.Thread] = None
+        self.transport: Optional[asyncio.DatagramTransport] = None
+
+        # Called after each new sample is published
+        self.on_sample: Optional[Callable[[], None]] = None
 
         # Calibration offsets (set when platform is level)
         self.roll_offset = 0.0
@@ -63,36 +96,72 @@ class IMUStreamer:
         print(f"3. Set target port to {port}")
         print("4. Start streaming accelerometer/gyroscope data\n")
 
-    def start(self):
-        """Start receiving data in background thread"""
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """
+        Start receiving data
+
+        Args:
+            loop: Receive datagrams with callbacks on this event loop instead of a
+                background thread (call from the loop's own thread)
+        """
         self.running = True
-        self.thread = threading.Thread(target=self._receive_loop, daemon=True)
-        self.thread.start()
+        if loop is not None:
+            loop.create_task(self._start_endpoint(loop))
+        else:
+            self.thread = threading.Thread(target=self._receive_loop, daemon=True)
+            self.thread.start()
+
+    async def _start_endpoint(self, loop: asyncio.AbstractEventLoop):
+        """Register the bound socket with the event loop"""
+        self.transport, _ = await loop.create_datagram_endpoint(
+            lambda: _IMUProtocol(self), sock=self.socket
+        )
 
     def stop(self):
         """Stop receiving data"""
         self.running = False
         if self.thread:
             self.thread.join()
+        if self.transport:
+            self.transport.close()
+            self.transport = None
         self.socket.close()
 
     def _receive_loop(self):
-        """Background thread that receives UDP packets"""
+        """
+        Background thread that receives UDP packets
+
+        Packets that arrive in a burst are drained together and only the newest
+        is parsed, since each one replaces the previous sample anyway.
+        """
+        buffer = bytearray(4096)
+        view = memoryview(buffer)
+
         while self.running:
-            try:
-                data, addr = self.socket.recvfrom(4096)
-                self._parse_data(data)
-            except socket.timeout:
+            # Wait up to 100ms for data so stop() is noticed promptly
+            readable, _, _ = select.select([self.socket], [], [], 0.1)
+            if not readable:
                 continue
+
+            size = None
+            try:
+                while True:
+                    size, _ = self.socket.recvfrom_into(buffer)
+            except BlockingIOError:
+                pass
             except Exception as e:
                 print(f"Error receiving data: {e}")
                 continue
 
-    def _parse_data(self, data: bytes):
+            if size is not None:
+                self._parse_data(view[:size])
+
+    def _parse_data(self, data: Union[bytes, memoryview]):
         """Parse incoming IMU data (supports multiple formats)"""
         try:
             # Try JSON format first (most common)
-            json_data = json.loads(data.decode("utf-8"))
+            # orjson parses the datagram bytes directly, no str decode
+            json_data = orjson.loads(data)
 
             # Support various JSON formats
             if "roll" in json_data and "pitch" in json_data:
@@ -117,32 +186,40 @@ class IMUStreamer:
             pitch -= self.pitch_offset
             yaw -= self.yaw_offset
 
-            self.latest_data = IMUData(roll=roll, pitch=pitch, yaw=yaw, timestamp=time.time())
+            self._publish(IMUData(roll=roll, pitch=pitch, yaw=yaw, timestamp=time.time()))
 
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             # Try binary format (custom protocol)
-            if len(data) == 12:  # 3 floats
-                try:
-                    roll, pitch, yaw = struct.unpack("fff", data)
-                    roll = np.rad2deg(roll)
-                    pitch = np.rad2deg(pitch)
-                    yaw = np.rad2deg(yaw)
-
-                    self.latest_data = IMUData(
+            if len(data) == _BINARY_ANGLES.size:
+                roll, pitch, yaw = _BINARY_ANGLES.unpack(data)
+                roll = math.degrees(roll)
+                pitch = math.degrees(pitch)
+                yaw = math.degrees(yaw)
+
+                self._publish(
+                    IMUData(
                         roll=roll - self.roll_offset,
                         pitch=pitch - self.pitch_offset,
                         yaw=yaw - self.yaw_offset,
                         timestamp=time.time(),
                     )
-                except struct.error:
-                    pass
+                )
+
+    def _publish(self, data: IMUData):
+        """Make a new sample the latest one and notify on_sample"""
+        self.latest_data = data
+        callback = self.on_sample
+        if callback is not None:
+            callback()
 
     def calibrate(self):
         """Set current orientation as zero reference"""
-        if self.latest_data:
-            self.roll_offset = self.latest_data.roll + self.roll_offset
-            self.pitch_offset = self.latest_data.pitch + self.pitch_offset
-            self.yaw_offset = self.latest_data.yaw + self.yaw_offset
+        # Read the latest sample once, so all three offsets come from the same packet
+        data = self.latest_data
+        if data:
+            self.roll_offset = data.roll + self.roll_offset
+            self.pitch_offset = data.pitch + self.pitch_offset
+            self.yaw_offset = data.yaw + self.yaw_offset
             print(
                 f"Calibrated: Roll={self.roll_offset:.2f}°, Pitch={self.pitch_offset:.2f}°, Yaw={self.yaw_offset:.2f}°"
             )
@@ -155,8 +232,9 @@ class IMUStreamer:
 
     def get_tilt_angles(self) -> tuple[float, float]:
         """Get roll and pitch for platform leveling (ignores yaw)"""
-        if self.latest_data:
-            return self.latest_data.roll, self.latest_data.pitch
+        data = self.latest_data
+        if data:
+            return data.roll, data.pitch
         return 0.0, 0.0
 
 
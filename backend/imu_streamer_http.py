@@ -9,55 +9,130 @@ Configure Sensor Logger:
 - Method: POST
 """
 
-import json
+import math
 import threading
 import time
-from dataclasses import dataclass
-from http.server import BaseHTTPRequestHandler, HTTPServer
-from typing import Optional
+from collections import deque
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, List, Optional, Tuple
 
 import numpy as np
+import orjson
 
 
-@dataclass
+@dataclass(frozen=True)
 class IMUData:
-    """Container for IMU orientation data"""
+    """
+    Container for IMU orientation data
+
+    Frozen, so a published sample is never modified; the handler publishes
+    each new sample with a single reference assignment.
+    """
 
     roll: float  # degrees, rotation about X axis
     pitch: float  # degrees, rotation about Y axis
     yaw: float  # degrees, rotation about Z axis
     timestamp: float
+    tilt_magnitude: float = field(init=False)  # degrees, combined roll and pitch
+
+    def __post_init__(self):
+        # Computed once per sample rather than by every reader
+        object.__setattr__(self, "tilt_magnitude", math.hypot(self.roll, self.pitch))
 
     def to_radians(self):
         """Convert angles to radians"""
-        return np.array([np.deg2rad(self.roll), np.deg2rad(self.pitch), np.deg2rad(self.yaw)])
+        return np.array((math.radians(self.roll), math.radians(self.pitch), math.radians(self.yaw)))
+
+
+def quaternions_to_euler(quaternions: np.ndarray) -> np.ndarray:
+    """
+    Convert a batch of quaternions to Euler angles in one pass
+
+    Same convention as IMUHTTPHandler._quaternion_to_euler, for replaying logged
+    samples; pitch saturates at +/-90 degrees in gimbal lock.
+
+    Args:
+        quaternions: (N, 4) array of w, x, y, z
+
+    Returns:
+        (N, 3) array of roll, pitch, yaw in degrees
+    """
+    w, x, y, z = np.asarray(quaternions, dtype=np.float64).T
+
+    euler = np.empty((len(w), 3))
+    np.arctan2(2 * (w * x + y * z), 1 - 2 * (x * x + y * y), out=euler[:, 0])
+    np.arcsin(np.clip(2 * (w * y - z * x), -1.0, 1.0), out=euler[:, 1])
+    np.arctan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z), out=euler[:, 2])
+    return np.degrees(euler, out=euler)
+
+
+_INDEX_HTML = b"""
+            <html>
+            <head><title>IMU Receiver</title></head>
+            <body>
+            <h1>IMU Data Receiver</h1>
+            <p>Listening for iPhone IMU data...</p>
+            <p>Send POST requests to: http://THIS_IP:8080/imu</p>
+            </body>
+            </html>
+            """
+
+
+def _is_orientation(item) -> bool:
+    """Whether a Sensor Logger payload entry is the orientation sensor"""
+    return isinstance(item, dict) and item.get("name") == "orientation"
 
 
 class IMUHTTPHandler(BaseHTTPRequestHandler):
     """HTTP request handler for IMU data"""
 
+    # Keep-alive, so Sensor Logger reuses one connection for all of its POSTs
+    protocol_version = "HTTP/1.1"
+
     # Class variable to store latest data (shared across requests)
     latest_data: Optional[IMUData] = None
-    roll_offset = 0.0
-    pitch_offset = 0.0
-    yaw_offset = 0.0
+
+    # Calibration offsets as (roll, pitch, yaw) degrees; replaced as one tuple so
+    # a POST never sees a half-applied calibration
+    offsets: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+
+    # Recent samples in arrival order, for consumers that need every one; deque
+    # append/popleft are atomic, so the HTTP thread and a reader need no lock
+    history: Deque[IMUData] = deque(maxlen=64)
+
+    # Largest request body accepted; Sensor Logger batches are tens of KB
+    max_body_size = 1 << 20
+
+    # Position of the orientation entry in the last Sensor Logger payload list
+    _orientation_index = 0
+
+    # The first message is printed once to help identify the payload format
+    _first_message_printed = False
 
     def do_POST(self):
         """Handle POST requests from Sensor Logger"""
         if self.path == "/imu" or self.path == "/":
             try:
-                # Read the POST data
                 content_length = int(self.headers.get("Content-Length", 0))
-                post_data = self.rfile.read(content_length)
-
-                # Parse JSON
-                data = json.loads(post_data.decode("utf-8"))
+                if content_length > self.max_body_size:
+                    # The body is left unread, so the connection can't be reused
+                    self.close_connection = True
+                    self._respond(413)
+                    return
+
+                # Read the POST data straight into one buffer; orjson parses it
+                # in place, with no intermediate bytes copy or str decode
+                post_data = bytearray(content_length)
+                if self.rfile.readinto(post_data) != content_length:
+                    raise ValueError("request body shorter than Content-Length")
+                data = orjson.loads(post_data)
 
                 # Debug: Print first message to see format
-                if not hasattr(IMUHTTPHandler, "_first_message_printed"):
+                if not IMUHTTPHandler._first_message_printed:
                     print("\n" + "=" * 60)
                     print("First message received from Sensor Logger:")
-                    print(json.dumps(data, indent=2))
+                    print(orjson.dumps(data, option=orjson.OPT_INDENT_2).decode())
                     print("=" * 60 + "\n")
                     IMUHTTPHandler._first_message_printed = True
 
@@ -66,64 +141,59 @@ class IMUHTTPHandler(BaseHTTPRequestHandler):
                 roll, pitch, yaw = self._extract_orientation(data)
 
                 # Apply calibration offsets
-                roll -= IMUHTTPHandler.roll_offset
-                pitch -= IMUHTTPHandler.pitch_offset
-                yaw -= IMUHTTPHandler.yaw_offset
+                roll_offset, pitch_offset, yaw_offset = IMUHTTPHandler.offsets
+                roll -= roll_offset
+                pitch -= pitch_offset
+                yaw -= yaw_offset
 
                 # Store latest data
-                IMUHTTPHandler.latest_data = IMUData(
-                    roll=roll, pitch=pitch, yaw=yaw, timestamp=time.time()
-                )
+                sample = IMUData(roll=roll, pitch=pitch, yaw=yaw, timestamp=time.time())
+                IMUHTTPHandler.history.append(sample)
+                IMUHTTPHandler.latest_data = sample
 
                 # Send success response
-                self.send_response(200)
-                self.send_header("Content-type", "application/json")
-                self.end_headers()
-                self.wfile.write(b'{"status": "ok"}')
+                self._respond(200, b'{"status": "ok"}')
 
             except Exception as e:
                 print(f"Error parsing data: {e}")
-                self.send_response(400)
-                self.end_headers()
+                self.close_connection = True
+                self._respond(400)
         else:
-            # Wrong path
-            self.send_response(404)
-            self.end_headers()
+            # Wrong path; the body is left unread, so the connection can't be reused
+            self.close_connection = True
+            self._respond(404)
 
     def do_GET(self):
         """Handle GET requests (for testing)"""
         if self.path == "/status":
-            self.send_response(200)
-            self.send_header("Content-type", "application/json")
-            self.end_headers()
-
-            if IMUHTTPHandler.latest_data:
+            # Read the latest sample once, so all fields come from the same POST
+            data = IMUHTTPHandler.latest_data
+            if data:
                 response = {
                     "status": "receiving",
-                    "roll": IMUHTTPHandler.latest_data.roll,
-                    "pitch": IMUHTTPHandler.latest_data.pitch,
-                    "yaw": IMUHTTPHandler.latest_data.yaw,
-                    "age": time.time() - IMUHTTPHandler.latest_data.timestamp,
+                    "roll": data.roll,
+                    "pitch": data.pitch,
+                    "yaw": data.yaw,
+                    "age": time.time() - data.timestamp,
                 }
             else:
                 response = {"status": "waiting"}
 
-            self.wfile.write(json.dumps(response).encode())
+            self._respond(200, orjson.dumps(response))
         else:
-            self.send_response(200)
-            self.send_header("Content-type", "text/html")
-            self.end_headers()
-            html = """
-            <html>
-            <head><title>IMU Receiver</title></head>
-            <body>
-            <h1>IMU Data Receiver</h1>
-            <p>Listening for iPhone IMU data...</p>
-            <p>Send POST requests to: http://THIS_IP:8080/imu</p>
-            </body>
-            </html>
-            """
-            self.wfile.write(html.encode())
+            self._respond(200, _INDEX_HTML, "text/html")
+
+    def _respond(self, status: int, body: bytes = b"", content_type: str = "application/json"):
+        """Send a complete response; Content-Length lets the client reuse the connection"""
+        self.send_response(status)
+        if body:
+            self.send_header("Content-type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            # Tell the client too, so it opens a new connection for its next request
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
 
     def _extract_orientation(self, data):
         """Extract roll, pitch, yaw from various JSON formats"""
@@ -134,15 +204,21 @@ class IMUHTTPHandler(BaseHTTPRequestHandler):
 
             # Payload is a list of sensor readings
             if isinstance(payload, list):
-                # Find the orientation sensor
-                for item in payload:
-                    if isinstance(item, dict) and item.get("name") == "orientation":
-                        values = item.get("values", {})
-                        # Sensor Logger gives angles in radians, convert to degrees
-                        roll = np.rad2deg(float(values.get("roll", 0)))
-                        pitch = np.rad2deg(float(values.get("pitch", 0)))
-                        yaw = np.rad2deg(float(values.get("yaw", 0)))
-                        return roll, pitch, yaw
+                # Find the orientation sensor, first at the position it was last
+                # found at, since Sensor Logger keeps one sensor order per session
+                index = IMUHTTPHandler._orientation_index
+                if not (index < len(payload) and _is_orientation(payload[index])):
+                    index = next(
+                        (i for i, item in enumerate(payload) if _is_orientation(item)), None
+                    )
+                if index is not None:
+                    IMUHTTPHandler._orientation_index = index
+                    values = payload[index].get("values", {})
+                    # Sensor Logger gives angles in radians, convert to degrees
+                    roll = math.degrees(float(values.get("roll", 0)))
+                    pitch = math.degrees(float(values.get("pitch", 0)))
+                    yaw = math.degrees(float(values.get("yaw", 0)))
+                    return roll, pitch, yaw
 
             # If payload is dict, continue with normal parsing
             data = payload
@@ -167,9 +243,9 @@ class IMUHTTPHandler(BaseHTTPRequestHandler):
             motion = data["motion"]
             if "attitude" in motion:
                 att = motion["attitude"]
-                roll = np.rad2deg(float(att.get("roll", 0)))
-                pitch = np.rad2deg(float(att.get("pitch", 0)))
-                yaw = np.rad2deg(float(att.get("yaw", 0)))
+                roll = math.degrees(float(att.get("roll", 0)))
+                pitch = math.degrees(float(att.get("pitch", 0)))
+                yaw = math.degrees(float(att.get("yaw", 0)))
                 return roll, pitch, yaw
 
         # Try quaternion conversion (if available)
@@ -200,8 +276,8 @@ class IMUHTTPHandler(BaseHTTPRequestHandler):
 
             # Calculate roll and pitch from accelerometer
             if az != 0:  # Avoid division by zero
-                roll = np.rad2deg(np.arctan2(ay, az))
-                pitch = np.rad2deg(np.arctan2(-ax, np.sqrt(ay * ay + az * az)))
+                roll = math.degrees(math.atan2(ay, az))
+                pitch = math.degrees(math.atan2(-ax, math.hypot(ay, az)))
                 yaw = 0.0  # Can't determine yaw from accelerometer alone
 
                 return roll, pitch, yaw
@@ -230,24 +306,25 @@ class IMUHTTPHandler(BaseHTTPRequestHandler):
                 print(f"First item: {data['payload'][0]}")
         return 0.0, 0.0, 0.0
 
-    def _quaternion_to_euler(self, w, x, y, z):
+    @staticmethod
+    def _quaternion_to_euler(w, x, y, z):
         """Convert quaternion to Euler angles (roll, pitch, yaw) in degrees"""
         # Roll (x-axis rotation)
         sinr_cosp = 2 * (w * x + y * z)
         cosr_cosp = 1 - 2 * (x * x + y * y)
-        roll = np.rad2deg(np.arctan2(sinr_cosp, cosr_cosp))
+        roll = math.degrees(math.atan2(sinr_cosp, cosr_cosp))
 
         # Pitch (y-axis rotation)
         sinp = 2 * (w * y - z * x)
         if abs(sinp) >= 1:
-            pitch = np.rad2deg(np.copysign(np.pi / 2, sinp))
+            pitch = math.copysign(90.0, sinp)
         else:
-            pitch = np.rad2deg(np.arcsin(sinp))
+            pitch = math.degrees(math.asin(sinp))
 
         # Yaw (z-axis rotation)
         siny_cosp = 2 * (w * z + x * y)
         cosy_cosp = 1 - 2 * (y * y + z * z)
-        yaw = np.rad2deg(np.arctan2(siny_cosp, cosy_cosp))
+        yaw = math.degrees(math.atan2(siny_cosp, cosy_cosp))
 
         return roll, pitch, yaw
 
@@ -262,7 +339,7 @@ class IMUHTTPStreamer:
     def __init__(self, host="0.0.0.0", port=8080):
         self.host = host
         self.port = port
-        self.server: Optional[HTTPServer] = None
+        self.server: Optional[ThreadingHTTPServer] = None
         self.thread: Optional[threading.Thread] = None
         self.running = False
 
@@ -293,39 +370,36 @@ class IMUHTTPStreamer:
     def start(self):
         """Start the HTTP server in background thread"""
         self.running = True
-        self.server = HTTPServer((self.host, self.port), IMUHTTPHandler)
-        self.thread = threading.Thread(target=self._serve, daemon=True)
+        # One thread per connection, so a slow client doesn't hold up the others
+        self.server = ThreadingHTTPServer((self.host, self.port), IMUHTTPHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
         self.thread.start()
         print(f"HTTP server listening on {self.host}:{self.port}")
         print("Waiting for data from iPhone...\n")
 
-    def _serve(self):
-        """Serve HTTP requests"""
-        while self.running:
-            self.server.handle_request()
-
     def stop(self):
         """Stop the HTTP server"""
         self.running = False
         if self.server:
             self.server.shutdown()
+            self.server.server_close()
         if self.thread:
             self.thread.join()
 
     def calibrate(self):
         """Set current orientation as zero reference"""
-        if IMUHTTPHandler.latest_data:
-            IMUHTTPHandler.roll_offset = (
-                IMUHTTPHandler.latest_data.roll + IMUHTTPHandler.roll_offset
-            )
-            IMUHTTPHandler.pitch_offset = (
-                IMUHTTPHandler.latest_data.pitch + IMUHTTPHandler.pitch_offset
-            )
-            IMUHTTPHandler.yaw_offset = IMUHTTPHandler.latest_data.yaw + IMUHTTPHandler.yaw_offset
+        # Read the latest sample once, so all three offsets come from the same POST
+        data = IMUHTTPHandler.latest_data
+        if data:
+            roll_offset, pitch_offset, yaw_offset = IMUHTTPHandler.offsets
+            roll_offset += data.roll
+            pitch_offset += data.pitch
+            yaw_offset += data.yaw
+            IMUHTTPHandler.offsets = (roll_offset, pitch_offset, yaw_offset)
             print(
-                f"Calibrated: Roll={IMUHTTPHandler.roll_offset:.2f}°, "
-                f"Pitch={IMUHTTPHandler.pitch_offset:.2f}°, "
-                f"Yaw={IMUHTTPHandler.yaw_offset:.2f}°"
+                f"Calibrated: Roll={roll_offset:.2f}°, "
+                f"Pitch={pitch_offset:.2f}°, "
+                f"Yaw={yaw_offset:.2f}°"
             )
         else:
             print("No data received yet, cannot calibrate")
@@ -334,10 +408,25 @@ class IMUHTTPStreamer:
         """Get most recent IMU data"""
         return IMUHTTPHandler.latest_data
 
+    def get_samples(self) -> List[IMUData]:
+        """
+        Take every sample received since the last call, oldest first
+
+        Only the most recent 64 are kept, so call at least that often to see all of them.
+        """
+        history = IMUHTTPHandler.history
+        samples = []
+        while True:
+            try:
+                samples.append(history.popleft())
+            except IndexError:
+                return samples
+
     def get_tilt_angles(self) -> tuple[float, float]:
         """Get roll and pitch for platform leveling (ignores yaw)"""
-        if IMUHTTPHandler.latest_data:
-            return IMUHTTPHandler.latest_data.roll, IMUHTTPHandler.latest_data.pitch
+        data = IMUHTTPHandler.latest_data
+        if data:
+            return data.roll, data.pitch
         return 0.0, 0.0
 
 
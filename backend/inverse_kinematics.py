@@ -3,11 +3,18 @@ Inverse Kinematics Solver for Platform Leveling
 Supports both 3-actuator tripod and Stewart platform (3-DOF/6-DOF)
 """
 
+import math
 from dataclasses import dataclass
-from typing import List, Tuple
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
 import numpy as np
 
+from ik_kernel import solve_points_batch_kernel, solve_points_kernel
+
+# Solutions memoized per solver when it is given a cache_resolution
+SOLVE_CACHE_SIZE = 4096
+
 
 @dataclass
 class PlatformConfig:
@@ -20,6 +27,28 @@ class PlatformConfig:
     actuator_stroke: float  # meters (maximum actuator extension)
 
 
+def rotation_matrix(roll: float, pitch: float, yaw: float = 0) -> np.ndarray:
+    """
+    Create rotation matrix from Euler angles (in radians)
+    Order: Yaw (Z) -> Pitch (Y) -> Roll (X), i.e. R = Rz @ Ry @ Rx in closed form
+    """
+    sr, cr = math.sin(roll), math.cos(roll)
+    sp, cp = math.sin(pitch), math.cos(pitch)
+    sy, cy = math.sin(yaw), math.cos(yaw)
+
+    R = np.empty((3, 3))
+    R[0, 0] = cy * cp
+    R[0, 1] = cy * sp * sr - sy * cr
+    R[0, 2] = cy * sp * cr + sy * sr
+    R[1, 0] = sy * cp
+    R[1, 1] = sy * sp * sr + cy * cr
+    R[1, 2] = sy * sp * cr - cy * sr
+    R[2, 0] = -sp
+    R[2, 1] = cp * sr
+    R[2, 2] = cp * cr
+    return R
+
+
 class TripodIK:
     """
     Inverse kinematics for 3-actuator tripod configuration
@@ -34,8 +63,17 @@ class TripodIK:
     - Z: vertical (up)
     """
 
-    def __init__(self, config: PlatformConfig):
+    def __init__(self, config: PlatformConfig, cache_resolution: Optional[float] = None):
+        """
+        Args:
+            config: Platform physical configuration
+            cache_resolution: Round angles (radians) and offsets (meters) to this step
+                and reuse the solution for repeated poses; None solves every call exactly
+        """
         self.config = config
+        self.cache_resolution = cache_resolution
+        if cache_resolution:
+            self._solve_rounded = lru_cache(maxsize=SOLVE_CACHE_SIZE)(self._solve_rounded)
 
         # Define actuator mounting points on base (fixed frame)
         # Triangular configuration for stability
@@ -58,6 +96,18 @@ class TripodIK:
             ]
         )
 
+        # Kernel geometry as (3, N) rows of xs, ys, zs; platform points relative
+        # to the level pivot at (0, 0, min_height)
+        self._pivot_height = float(config.min_height)
+        self._base_xyz = np.ascontiguousarray(self.base_points.T, dtype=np.float64)
+        self._local_xyz = np.ascontiguousarray(
+            (self.platform_points - (0.0, 0.0, self._pivot_height)).T
+        )
+
+        # Valid actuator lengths span the stroke above min_height
+        self._min_length = float(config.min_height)
+        self._max_length = float(config.min_height + config.actuator_stroke)
+
         print("Tripod IK initialized:")
         print(f"  Platform: {config.length*1000:.0f}mm x {config.width*1000:.0f}mm")
         print(f"  Height range: {config.min_height*1000:.0f}mm - {config.max_height*1000:.0f}mm")
@@ -68,21 +118,7 @@ class TripodIK:
         Create rotation matrix from Euler angles (in radians)
         Order: Yaw (Z) -> Pitch (Y) -> Roll (X)
         """
-        # Roll (rotation about X)
-        Rx = np.array(
-            [[1, 0, 0], [0, np.cos(roll), -np.sin(roll)], [0, np.sin(roll), np.cos(roll)]]
-        )
-
-        # Pitch (rotation about Y)
-        Ry = np.array(
-            [[np.cos(pitch), 0, np.sin(pitch)], [0, 1, 0], [-np.sin(pitch), 0, np.cos(pitch)]]
-        )
-
-        # Yaw (rotation about Z)
-        Rz = np.array([[np.cos(yaw), -np.sin(yaw), 0], [np.sin(yaw), np.cos(yaw), 0], [0, 0, 1]])
-
-        # Combined rotation: R = Rz * Ry * Rx
-        return Rz @ Ry @ Rx
+        return rotation_matrix(roll, pitch, yaw)
 
     def solve(
         self, roll: float, pitch: float, yaw: float = 0, height_offset: float = 0
@@ -100,35 +136,70 @@ class TripodIK:
             actuator_lengths: Array of 3 actuator lengths in meters
             valid: Boolean indicating if solution is within limits
         """
-        # Get rotation matrix
-        R = self.rotation_matrix(roll, pitch, yaw)
+        pose = (roll, pitch, yaw, height_offset)
+        if self.cache_resolution:
+            step = self.cache_resolution
+            actuator_lengths, valid = self._solve_rounded(*(round(v / step) for v in pose))
+            return actuator_lengths.copy(), valid
 
-        # Center position of platform (when level)
-        center = np.array([0, 0, self.config.min_height + height_offset])
+        return self._solve(*pose)
 
-        # Calculate rotated platform points
-        rotated_platform_points = []
-        for point in self.platform_points:
-            # Translate to origin, rotate, translate back
-            local_point = point - center
-            rotated_point = R @ local_point + center
-            rotated_platform_points.append(rotated_point)
+    def _solve_rounded(self, *steps: int) -> Tuple[np.ndarray, bool]:
+        """Solve for a pose given in multiples of cache_resolution"""
+        return self._solve(*(n * self.cache_resolution for n in steps))
 
-        rotated_platform_points = np.array(rotated_platform_points)
+    def _solve(
+        self, roll: float, pitch: float, yaw: float, height_offset: float
+    ) -> Tuple[np.ndarray, bool]:
+        """Solve exactly; see solve()"""
+        # Rotate about the level center, raised by height_offset, in one compiled pass
+        actuator_lengths, valid = solve_points_kernel(
+            self._base_xyz,
+            self._local_xyz,
+            height_offset,
+            roll,
+            pitch,
+            yaw,
+            0.0,
+            0.0,
+            self._pivot_height + height_offset,
+            self._min_length,
+            self._max_length,
+        )
+
+        return actuator_lengths, valid
 
-        # Calculate actuator lengths (distance from base to platform attachment)
-        actuator_lengths = np.linalg.norm(rotated_platform_points - self.base_points, axis=1)
+    def solve_batch(
+        self, angles: np.ndarray, height_offset: float = 0
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Solve inverse kinematics for many orientations in one compiled call
 
-        # Check if solution is valid (within actuator stroke limits)
-        min_length = self.config.min_height
-        max_length = self.config.min_height + self.config.actuator_stroke
+        Unlike solve(), results are never cached or rounded.
 
-        valid = np.all(actuator_lengths >= min_length) and np.all(actuator_lengths <= max_length)
+        Args:
+            angles: (B, 3) roll, pitch, yaw in radians
+            height_offset: Additional vertical offset in meters, shared by all poses
 
-        return actuator_lengths, valid
+        Returns:
+            actuator_lengths: (B, 3) actuator lengths in meters
+            valid: (B,) booleans indicating which solutions are within limits
+        """
+        angles = np.ascontiguousarray(angles, dtype=np.float64)
+        positions = np.zeros_like(angles)
+        positions[:, 2] = self._pivot_height + height_offset
+        return solve_points_batch_kernel(
+            self._base_xyz,
+            self._local_xyz,
+            height_offset,
+            angles,
+            positions,
+            self._min_length,
+            self._max_length,
+        )
 
     def level_platform(
-        self, measured_roll: float, measured_pitch: float
+        self, measured_roll: float, measured_pitch: float, measured_yaw: float = 0
     ) -> Tuple[np.ndarray, bool]:
         """
         Calculate actuator lengths to level platform
@@ -136,6 +207,8 @@ class TripodIK:
         Args:
             measured_roll: Current roll angle in radians
             measured_pitch: Current pitch angle in radians
+            measured_yaw: Ignored; a tripod cannot correct yaw. Accepted so callers
+                can pass the same angles to either solver
 
         Returns:
             actuator_lengths: Required actuator lengths to achieve level
@@ -160,9 +233,24 @@ class StewartPlatformIK:
     For 3-DOF mode, we only use Z translation + Roll + Pitch
     """
 
-    def __init__(self, config: PlatformConfig, dof_mode: str = "3DOF"):
+    def __init__(
+        self,
+        config: PlatformConfig,
+        dof_mode: str = "3DOF",
+        cache_resolution: Optional[float] = None,
+    ):
+        """
+        Args:
+            config: Platform physical configuration
+            dof_mode: '3DOF' or '6DOF'
+            cache_resolution: Round angles (radians) and offsets (meters) to this step
+                and reuse the solution for repeated poses; None solves every call exactly
+        """
         self.config = config
         self.dof_mode = dof_mode  # '3DOF' or '6DOF'
+        self.cache_resolution = cache_resolution
+        if cache_resolution:
+            self._solve_rounded = lru_cache(maxsize=SOLVE_CACHE_SIZE)(self._solve_rounded)
 
         # Define actuator mounting points - hexagonal pattern
         # Base platform (fixed) - 6 points in hexagonal arrangement
@@ -187,6 +275,18 @@ class StewartPlatformIK:
             self.platform_points.append([x, y, config.min_height])
         self.platform_points = np.array(self.platform_points)
 
+        # Kernel geometry as (3, N) rows of xs, ys, zs; platform points relative
+        # to the level center at (0, 0, min_height)
+        self._pivot_height = float(config.min_height)
+        self._base_xyz = np.ascontiguousarray(self.base_points.T, dtype=np.float64)
+        self._local_xyz = np.ascontiguousarray(
+            (self.platform_points - (0.0, 0.0, self._pivot_height)).T
+        )
+
+        # Valid actuator lengths span the stroke above min_height
+        self._min_length = float(config.min_height)
+        self._max_length = float(config.min_height + config.actuator_stroke)
+
         print(f"Stewart Platform IK initialized ({dof_mode}):")
         print(f"  Platform: {config.length*1000:.0f}mm x {config.width*1000:.0f}mm")
         print(f"  Height range: {config.min_height*1000:.0f}mm - {config.max_height*1000:.0f}mm")
@@ -196,17 +296,7 @@ class StewartPlatformIK:
     def rotation_matrix(self, roll: float, pitch: float, yaw: float) -> np.ndarray:
         """Create rotation matrix from Euler angles (in radians)"""
         # Same as TripodIK
-        Rx = np.array(
-            [[1, 0, 0], [0, np.cos(roll), -np.sin(roll)], [0, np.sin(roll), np.cos(roll)]]
-        )
-
-        Ry = np.array(
-            [[np.cos(pitch), 0, np.sin(pitch)], [0, 1, 0], [-np.sin(pitch), 0, np.cos(pitch)]]
-        )
-
-        Rz = np.array([[np.cos(yaw), -np.sin(yaw), 0], [np.sin(yaw), np.cos(yaw), 0], [0, 0, 1]])
-
-        return Rz @ Ry @ Rx
+        return rotation_matrix(roll, pitch, yaw)
 
     def solve(
         self,
@@ -228,32 +318,76 @@ class StewartPlatformIK:
             actuator_lengths: Array of 6 actuator lengths in meters
             valid: Boolean indicating if solution is within limits
         """
-        # Get rotation matrix
-        R = self.rotation_matrix(roll, pitch, yaw)
+        pose = (roll, pitch, yaw, x_offset, y_offset, z_offset)
+        if self.cache_resolution:
+            step = self.cache_resolution
+            actuator_lengths, valid = self._solve_rounded(*(round(v / step) for v in pose))
+            return actuator_lengths.copy(), valid
 
-        # Center position of platform
-        center = np.array([x_offset, y_offset, self.config.min_height + z_offset])
+        return self._solve(*pose)
 
-        # Calculate rotated and translated platform points
-        rotated_platform_points = []
-        for point in self.platform_points:
-            # Translate to origin, rotate, translate to desired position
-            local_point = point - np.array([0, 0, self.config.min_height])
-            rotated_point = R @ local_point + center
-            rotated_platform_points.append(rotated_point)
+    def _solve_rounded(self, *steps: int) -> Tuple[np.ndarray, bool]:
+        """Solve for a pose given in multiples of cache_resolution"""
+        return self._solve(*(n * self.cache_resolution for n in steps))
 
-        rotated_platform_points = np.array(rotated_platform_points)
+    def _solve(
+        self,
+        roll: float,
+        pitch: float,
+        yaw: float,
+        x_offset: float,
+        y_offset: float,
+        z_offset: float,
+    ) -> Tuple[np.ndarray, bool]:
+        """Solve exactly; see solve()"""
+        # Rotate about the level center and translate, in one compiled pass
+        actuator_lengths, valid = solve_points_kernel(
+            self._base_xyz,
+            self._local_xyz,
+            0.0,
+            roll,
+            pitch,
+            yaw,
+            x_offset,
+            y_offset,
+            self._pivot_height + z_offset,
+            self._min_length,
+            self._max_length,
+        )
 
-        # Calculate actuator lengths
-        actuator_lengths = np.linalg.norm(rotated_platform_points - self.base_points, axis=1)
+        return actuator_lengths, valid
 
-        # Check validity
-        min_length = self.config.min_height
-        max_length = self.config.min_height + self.config.actuator_stroke
+    def solve_batch(
+        self, angles: np.ndarray, offsets: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Solve inverse kinematics for many poses in one compiled call
 
-        valid = np.all(actuator_lengths >= min_length) and np.all(actuator_lengths <= max_length)
+        Unlike solve(), results are never cached or rounded.
 
-        return actuator_lengths, valid
+        Args:
+            angles: (B, 3) roll, pitch, yaw in radians
+            offsets: (B, 3) x, y, z translation offsets in meters (default none)
+
+        Returns:
+            actuator_lengths: (B, 6) actuator lengths in meters
+            valid: (B,) booleans indicating which solutions are within limits
+        """
+        angles = np.ascontiguousarray(angles, dtype=np.float64)
+        if offsets is None:
+            positions = np.zeros_like(angles)
+        else:
+            positions = np.array(offsets, dtype=np.float64)
+        positions[:, 2] += self._pivot_height
+        return solve_points_batch_kernel(
+            self._base_xyz,
+            self._local_xyz,
+            0.0,
+            angles,
+            positions,
+            self._min_length,
+            self._max_length,
+        )
 
     def level_platform(
         self, measured_roll: float, measured_pitch: float, measured_yaw: float = 0
@@ -3,7 +3,8 @@ Integrated Platform Leveling System
 Combines IMU data, inverse kinematics, and ESP32 controller
 """
 
-import struct
+import asyncio
+import math
 import threading
 import time
 from dataclasses import dataclass
@@ -12,7 +13,7 @@ from typing import Optional
 import numpy as np
 
 from esp32_controller import ESP32Controller, SerialProtocol
-from imu_streamer import IMUStreamer
+from imu_streamer import IMUData, IMUStreamer
 from inverse_kinematics import PlatformConfig, StewartPlatformIK, TripodIK
 
 
@@ -36,6 +37,10 @@ class PlatformLevelingSystem:
     - ESP32 controller with actuators
     """
 
+    # CMD_ENABLE payloads
+    _ENABLE_ON = b"\x01"
+    _ENABLE_OFF = b"\x00"
+
     def __init__(
         self,
         platform_type: str = "tripod",
@@ -84,13 +89,11 @@ class PlatformLevelingSystem:
         if use_iphone_imu:
             print("\nUsing iPhone IMU (for testing)...")
             self.imu = IMUStreamer()
-            self.imu.start()
         else:
             print("\nUsing BNO055 IMU (production)...")
             # TODO: Initialize BNO055 via I2C
             # For now, use iPhone as fallback
             self.imu = IMUStreamer()
-            self.imu.start()
 
         # 3. ESP32 Controller
         print("\nInitializing ESP32 Controller...")
@@ -102,6 +105,11 @@ class PlatformLevelingSystem:
         )
         self.controller.start()
 
+        # Reused for every set-target command: actuator lengths in mm as float32,
+        # sent through a byte view of the same memory
+        self._targets_mm = np.empty(num_actuators, dtype=np.float32)
+        self._targets_payload = memoryview(self._targets_mm).cast("B")
+
         # 4. Serial protocol
         self.protocol = SerialProtocol(self.controller)
         self.protocol.connect(simulated=True)
@@ -109,10 +117,19 @@ class PlatformLevelingSystem:
         # State variables
         self.leveling_enabled = False
         self.auto_level_enabled = False
-        self.last_orientation = np.array([0.0, 0.0, 0.0])  # roll, pitch, yaw
+        self.last_orientation = (0.0, 0.0, 0.0)  # roll, pitch, yaw
         self.leveling_thread: Optional[threading.Thread] = None
+        self.leveling_task: Optional[asyncio.Task] = None
         self.running = False
 
+        # Set by new IMU samples (and shutdown) to wake the auto-level loop;
+        # the asyncio.Event is only used when it runs as a task on _loop
+        self._wake = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_wake: Optional[asyncio.Event] = None
+        self.imu.on_sample = self.notify_new_sample
+        self.imu.start()
+
         print("\n" + "=" * 60)
         print("System initialized successfully!")
         print("=" * 60)
@@ -136,99 +153,169 @@ class PlatformLevelingSystem:
 
         if enable:
             # Enable actuators
-            self.protocol.send_command(ESP32Controller.CMD_ENABLE, struct.pack("B", 1))
+            self.protocol.send_command(ESP32Controller.CMD_ENABLE, self._ENABLE_ON)
             print("Leveling ENABLED")
         else:
             # Disable actuators
-            self.protocol.send_command(ESP32Controller.CMD_ENABLE, struct.pack("B", 0))
+            self.protocol.send_command(ESP32Controller.CMD_ENABLE, self._ENABLE_OFF)
             print("Leveling DISABLED")
 
-    def enable_auto_level(self, enable: bool = True):
-        """Enable or disable automatic continuous leveling"""
+    def enable_auto_level(
+        self, enable: bool = True, loop: Optional[asyncio.AbstractEventLoop] = None
+    ):
+        """
+        Enable or disable automatic continuous leveling
+
+        Args:
+            enable: Whether to level continuously
+            loop: Run the leveling loop as a task on this event loop instead of a
+                background thread (call from the loop's own thread)
+        """
         self.auto_level_enabled = enable
 
         if enable and not self.running:
             self.running = True
-            self.leveling_thread = threading.Thread(target=self._auto_level_loop, daemon=True)
-            self.leveling_thread.start()
+            if loop is not None:
+                self._loop = loop
+                self._async_wake = asyncio.Event()
+                self.leveling_task = loop.create_task(self._auto_level_loop_async())
+            else:
+                self.leveling_thread = threading.Thread(target=self._auto_level_loop, daemon=True)
+                self.leveling_thread.start()
             print("Auto-leveling ENABLED")
         elif not enable:
             print("Auto-leveling DISABLED")
 
-    def level_once(self):
-        """Perform single leveling operation"""
-        imu_data = self.imu.get_latest()
+    def level_once(self, imu_data: Optional[IMUData] = None):
+        """
+        Perform single leveling operation
+
+        Args:
+            imu_data: Sample to level against (default: the latest IMU sample)
+        """
+        if imu_data is None:
+            imu_data = self.imu.get_latest()
 
         if imu_data is None:
             print("No IMU data available")
             return False
 
-        # Convert to radians
-        roll = np.deg2rad(imu_data.roll)
-        pitch = np.deg2rad(imu_data.pitch)
-        yaw = np.deg2rad(imu_data.yaw)
+        # Read the sample's angles once
+        roll_deg, pitch_deg, yaw_deg = imu_data.roll, imu_data.pitch, imu_data.yaw
 
         # Check if leveling is needed
-        tilt_magnitude = np.sqrt(imu_data.roll**2 + imu_data.pitch**2)
+        tilt_magnitude = imu_data.tilt_magnitude
 
         if tilt_magnitude < self.leveling_config.level_threshold:
             print(f"Platform already level (tilt: {tilt_magnitude:.2f}°)")
             return True
 
         print(f"Leveling platform (tilt: {tilt_magnitude:.2f}°)...")
-        print(f"  Current orientation: Roll={imu_data.roll:.2f}°, Pitch={imu_data.pitch:.2f}°")
+        print(f"  Current orientation: Roll={roll_deg:.2f}°, Pitch={pitch_deg:.2f}°")
 
-        # Calculate required actuator positions
-        if self.platform_type == "tripod":
-            actuator_lengths, valid = self.ik_solver.level_platform(roll, pitch)
-        else:
-            actuator_lengths, valid = self.ik_solver.level_platform(roll, pitch, yaw)
+        # Calculate required actuator positions (the tripod solver ignores yaw).
+        # The solve itself runs in the compiled IK kernel.
+        actuator_lengths, valid = self.ik_solver.level_platform(
+            math.radians(roll_deg), math.radians(pitch_deg), math.radians(yaw_deg)
+        )
 
         if not valid:
             print("ERROR: Cannot level - solution outside actuator limits")
             return False
 
-        # Convert to mm
-        targets_mm = actuator_lengths * 1000
+        # Convert to mm, straight into the float32 command buffer
+        targets_mm = np.multiply(actuator_lengths, 1000.0, out=self._targets_mm)
 
         print(f"  Target positions: {[f'{t:.1f}' for t in targets_mm]} mm")
 
         # Send to controller
-        data = struct.pack(f"{len(targets_mm)}f", *targets_mm)
-        self.protocol.send_command(ESP32Controller.CMD_SET_TARGET, data)
+        self.protocol.send_command(ESP32Controller.CMD_SET_TARGET, self._targets_payload)
 
         return True
 
+    def notify_new_sample(self):
+        """Wake the auto-level loop because a new IMU sample arrived"""
+        self._wake.set()
+        async_wake = self._async_wake
+        if async_wake is not None:
+            # Samples arrive on the IMU thread; asyncio.Event must be set on its loop
+            try:
+                self._loop.call_soon_threadsafe(async_wake.set)
+            except RuntimeError:
+                pass  # loop closed, so the task has already ended
+
     def _auto_level_loop(self):
-        """Automatic leveling loop (runs in background)"""
+        """
+        Automatic leveling loop (runs in background)
+
+        Sleeps until a new IMU sample arrives instead of polling, then runs at
+        most once per update period.
+        """
         dt = 1.0 / self.leveling_config.update_rate
+        # Compare squared distances so the deadband check needs no sqrt
+        deadband_sq = self.leveling_config.deadband**2
+        threshold = self.leveling_config.level_threshold
 
         while self.running and self.auto_level_enabled:
-            start_time = time.time()
+            # Re-check the flags at least once per period even without samples
+            if not self._wake.wait(dt):
+                continue
+            self._wake.clear()
+            if not (self.running and self.auto_level_enabled):
+                break  # woken by shutdown; don't wait out the update period
+            deadline = time.monotonic() + dt
 
-            if self.leveling_enabled:
-                imu_data = self.imu.get_latest()
+            self._auto_level_step(deadband_sq, threshold)
 
-                if imu_data:
-                    # Get current orientation
-                    current_orientation = np.array([imu_data.roll, imu_data.pitch, imu_data.yaw])
+            # Sleep to maintain update rate
+            time.sleep(max(0.0, deadline - time.monotonic()))
 
-                    # Check if change exceeds deadband
-                    orientation_change = np.linalg.norm(current_orientation - self.last_orientation)
+    async def _auto_level_loop_async(self):
+        """Automatic leveling loop as an asyncio task; same schedule as _auto_level_loop"""
+        dt = 1.0 / self.leveling_config.update_rate
+        # Compare squared distances so the deadband check needs no sqrt
+        deadband_sq = self.leveling_config.deadband**2
+        threshold = self.leveling_config.level_threshold
 
-                    if orientation_change > self.leveling_config.deadband:
-                        # Check tilt magnitude
-                        tilt_mag = np.sqrt(imu_data.roll**2 + imu_data.pitch**2)
+        while self.running and self.auto_level_enabled:
+            try:
+                await asyncio.wait_for(self._async_wake.wait(), dt)
+            except asyncio.TimeoutError:
+                continue
+            self._async_wake.clear()
+            deadline = time.monotonic() + dt
 
-                        if tilt_mag > self.leveling_config.level_threshold:
-                            # Level the platform
-                            self.level_once()
-                            self.last_orientation = current_orientation
+            self._auto_level_step(deadband_sq, threshold)
 
-            # Sleep to maintain update rate
-            elapsed = time.time() - start_time
-            sleep_time = max(0, dt - elapsed)
-            time.sleep(sleep_time)
+            await asyncio.sleep(max(0.0, deadline - time.monotonic()))
+
+    def _auto_level_step(self, deadband_sq: float, threshold: float):
+        """
+        Level against the latest sample if it moved past the deadband and is tilted
+
+        Args:
+            deadband_sq: Squared deadband in degrees^2
+            threshold: Tilt in degrees above which to level
+        """
+        if not self.leveling_enabled:
+            return
+
+        imu_data = self.imu.get_latest()
+        if not imu_data:
+            return
+
+        roll, pitch, yaw = imu_data.roll, imu_data.pitch, imu_data.yaw
+        last_roll, last_pitch, last_yaw = self.last_orientation
+
+        # Check if change exceeds deadband
+        change_sq = (roll - last_roll) ** 2 + (pitch - last_pitch) ** 2 + (yaw - last_yaw) ** 2
+
+        # Check tilt magnitude
+        if change_sq > deadband_sq and imu_data.tilt_magnitude > threshold:
+            # Level the platform against the sample checked above; a newer
+            # one may already have been published
+            self.level_once(imu_data)
+            self.last_orientation = (roll, pitch, yaw)
 
     def get_status(self) -> dict:
         """Get complete system status"""
@@ -242,24 +329,49 @@ class PlatformLevelingSystem:
                 "roll": imu_data.roll if imu_data else None,
                 "pitch": imu_data.pitch if imu_data else None,
                 "yaw": imu_data.yaw if imu_data else None,
-                "tilt_magnitude": (
-                    np.sqrt(imu_data.roll**2 + imu_data.pitch**2) if imu_data else None
-                ),
+                "tilt_magnitude": imu_data.tilt_magnitude if imu_data else None,
             },
             "controller": controller_status,
         }
 
         return status
 
+    def _stop_leveling_task(self):
+        """Cancel the asyncio leveling task and wait until it has stopped"""
+        task, loop = self.leveling_task, self._loop
+        self.leveling_task = None
+        self._async_wake = None
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is not loop and loop.is_running():
+            # The loop runs in another thread; cancel there and wait for the task to end
+            async def cancel():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+            asyncio.run_coroutine_threadsafe(cancel(), loop).result()
+        elif not loop.is_closed():
+            # Called from the loop itself (or it is not running): the task is suspended
+            # and will not level again once cancelled
+            task.cancel()
+        # A closed loop will never resume the task, so there is nothing to cancel
+
     def shutdown(self):
         """Shutdown the system"""
         print("\nShutting down system...")
 
         self.running = False
         self.auto_level_enabled = False
+        self._wake.set()
 
         if self.leveling_thread:
             self.leveling_thread.join()
+        if self.leveling_task:
+            self._stop_leveling_task()
 
         # Disable actuators
         self.enable_leveling(False)
@@ -2,33 +2,129 @@
 Structured logging configuration
 """
 
+import atexit
+import copy
 import json
 import logging
+import queue
 import sys
-from datetime import datetime
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from typing import Dict, Optional
 
+import orjson
 from pythonjsonlogger import jsonlogger
 
 from config import settings
 
 
 class CustomJsonFormatter(jsonlogger.JsonFormatter):
-    """Custom JSON formatter with additional fields"""
+    """
+    Custom JSON formatter with additional fields
+
+    One instance is shared by all JSON handlers, and each record's output is
+    cached on the record, so a record is encoded once however many handlers
+    write it.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._environment = settings.environment
+        # (epoch second, formatted "YYYY-MM-DDTHH:MM:SS") of the last timestamp
+        self._second = (None, "")
+
+    def format(self, record: logging.LogRecord) -> str:
+        cached = record.__dict__.get("_json_output")
+        if cached is not None and cached[0] is self:
+            return cached[1]
+        output = super().format(record)
+        record._json_output = (self, output)
+        return output
+
+    def jsonify_log_record(self, log_record) -> str:
+        # orjson writes UTF-8 rather than \u escapes; the log files are opened as UTF-8
+        return orjson.dumps(log_record, default=self.json_default).decode()
 
     def add_fields(self, log_record, record, message_dict):
         super().add_fields(log_record, record, message_dict)
-        log_record["timestamp"] = datetime.utcnow().isoformat()
+        log_record["timestamp"] = self._timestamp(record.created)
         log_record["level"] = record.levelname
         log_record["logger"] = record.name
-        log_record["environment"] = settings.environment
+        log_record["environment"] = self._environment
 
         if record.exc_info:
             log_record["exception"] = self.formatException(record.exc_info)
 
+    def _timestamp(self, created: float) -> str:
+        """
+        Format a record's creation time as a UTC ISO 8601 string
+
+        Records arrive many per second, so the date and time part is formatted
+        once per second and only the microseconds are filled in per record.
+        """
+        seconds = int(created)
+        second, prefix = self._second
+        if second != seconds:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+            self._second = (seconds, prefix)
+        return f"{prefix}.{int((created - seconds) * 1e6):06d}"
+
+
+class _RecordQueueHandler(QueueHandler):
+    """QueueHandler that leaves all formatting, including tracebacks, to the listener"""
+
+    def prepare(self, record):
+        # Merge args now so the listener never formats objects that may have changed
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+# Background writer set up by setup_logging, and the root handler feeding it
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+
+# Last time a traceback was logged, per exception type
+_last_traceback: Dict[str, float] = {}
+_traceback_lock = threading.Lock()
+
+
+def traceback_allowed(exc: BaseException, interval: float = 1.0) -> bool:
+    """
+    Decide whether an error log should carry the full traceback
+
+    Formatting a traceback walks the whole stack, so during an error flood only
+    the first error of each type per interval gets one.
+
+    Args:
+        exc: Exception being logged
+        interval: Minimum seconds between tracebacks for the same exception type
+
+    Returns:
+        True if the traceback should be logged
+    """
+    name = type(exc).__qualname__
+    now = time.monotonic()
+    with _traceback_lock:
+        last = _last_traceback.get(name)
+        if last is not None and now - last < interval:
+            return False
+        _last_traceback[name] = now
+    return True
+
 
 def setup_logging():
-    """Configure application logging"""
+    """
+    Configure application logging
+
+    The root logger only enqueues records; a QueueListener thread formats them
+    and writes the console and log files, so callers never block on file I/O.
+    """
+    global _listener, _queue_handler
 
     # Create logs directory if it doesn't exist
     log_dir = Path("logs")
@@ -39,31 +135,40 @@ def setup_logging():
     root_logger.setLevel(getattr(logging, settings.log_level.upper()))
 
     # Remove existing handlers
+    shutdown_logging()
     root_logger.handlers.clear()
 
+    # One JSON formatter for every handler that writes JSON
+    json_formatter = CustomJsonFormatter("%(timestamp)s %(level)s %(name)s %(message)s")
+
     # Console handler with JSON formatting in production
     console_handler = logging.StreamHandler(sys.stdout)
     if settings.is_production:
-        console_formatter = CustomJsonFormatter("%(timestamp)s %(level)s %(name)s %(message)s")
+        console_formatter = json_formatter
     else:
         console_formatter = logging.Formatter(
             "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
             datefmt="%Y-%m-%d %H:%M:%S",
         )
     console_handler.setFormatter(console_formatter)
-    root_logger.addHandler(console_handler)
 
-    # File handler with JSON formatting
-    file_handler = logging.FileHandler(log_dir / "api.log")
-    file_formatter = CustomJsonFormatter("%(timestamp)s %(level)s %(name)s %(message)s")
-    file_handler.setFormatter(file_formatter)
-    root_logger.addHandler(file_handler)
+    # File handler with JSON formatting (files are opened on the first record)
+    file_handler = logging.FileHandler(log_dir / "api.log", encoding="utf-8", delay=True)
+    file_handler.setFormatter(json_formatter)
 
     # Error file handler
-    error_handler = logging.FileHandler(log_dir / "error.log")
+    error_handler = logging.FileHandler(log_dir / "error.log", encoding="utf-8", delay=True)
     error_handler.setLevel(logging.ERROR)
-    error_handler.setFormatter(file_formatter)
-    root_logger.addHandler(error_handler)
+    error_handler.setFormatter(json_formatter)
+
+    # Hand records to the writer thread through an unbounded queue
+    log_queue = queue.SimpleQueue()
+    _queue_handler = _RecordQueueHandler(log_queue)
+    root_logger.addHandler(_queue_handler)
+    _listener = QueueListener(
+        log_queue, console_handler, file_handler, error_handler, respect_handler_level=True
+    )
+    _listener.start()
 
     # Silence noisy loggers
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
@@ -74,44 +179,69 @@ def setup_logging():
     )
 
 
+def shutdown_logging():
+    """Write out queued records and stop the writer thread started by setup_logging"""
+    global _listener, _queue_handler
+
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+# Looked up once; getLogger takes the logging module lock on every call
+_request_logger = logging.getLogger("api.requests")
+
+
 # Request logging middleware
 async def log_request(request, call_next):
     """Log HTTP requests"""
-    logger = logging.getLogger("api.requests")
+    logger = _request_logger
+    # Decided once per request, so the extra dicts are only built when they will be logged
+    log_info = logger.isEnabledFor(logging.INFO)
 
-    start_time = datetime.utcnow()
+    start_time = time.perf_counter()
 
     # Log request
-    logger.info(
-        "Request started",
-        extra={
-            "method": request.method,
-            "path": request.url.path,
-            "query": str(request.query_params),
-            "client_ip": request.client.host if request.client else None,
-        },
-    )
-
-    # Process request
-    try:
-        response = await call_next(request)
-
-        # Log response
-        duration = (datetime.utcnow() - start_time).total_seconds() * 1000
+    if log_info:
         logger.info(
-            "Request completed",
+            "Request started",
             extra={
                 "method": request.method,
                 "path": request.url.path,
-                "status_code": response.status_code,
-                "duration_ms": duration,
+                "query": str(request.query_params),
+                "client_ip": request.client.host if request.client else None,
             },
         )
 
+    # Process request
+    try:
+        response = await call_next(request)
+
+        # Log response
+        if log_info:
+            duration = (time.perf_counter() - start_time) * 1000
+            logger.info(
+                "Request completed",
+                extra={
+                    "method": request.method,
+                    "path": request.url.path,
+                    "status_code": response.status_code,
+                    "duration_ms": duration,
+                },
+            )
+
         return response
 
     except Exception as e:
-        duration = (datetime.utcnow() - start_time).total_seconds() * 1000
+        duration = (time.perf_counter() - start_time) * 1000
         logger.error(
             "Request failed",
             extra={
@@ -120,6 +250,6 @@ async def log_request(request, call_next):
                 "error": str(e),
                 "duration_ms": duration,
             },
-            exc_info=True,
+            exc_info=traceback_allowed(e),
         )
         raise
@@ -3,6 +3,15 @@ Platform Comparison Demo
 Demonstrates and compares both 3-actuator tripod and Stewart platform configurations
 """
 
+import os
+
+import matplotlib
+
+# No one is there to look at the window on CI; render off-screen and skip the GUI toolkit.
+# Without a display, matplotlib already falls back to Agg on its own.
+if os.environ.get("CI"):
+    matplotlib.use("Agg")
+
 import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib.animation import FuncAnimation
@@ -53,79 +62,92 @@ class PlatformComparison:
 
         results = {"tripod": [], "stewart_3dof": [], "stewart_6dof": []}
 
-        # Test each configuration
-        for roll_deg, pitch_deg, yaw_deg, desc in self.test_angles:
+        # Solve every test pose per configuration in one batched call
+        angles = np.deg2rad([(roll, pitch, yaw) for roll, pitch, yaw, _ in self.test_angles])
+        level_angles = angles.copy()
+        level_angles[:, 2] = 0  # tripod and Stewart 3-DOF have no yaw control
+
+        tripod_lengths, tripod_valid = self.tripod.solve_batch(level_angles)
+        stewart_3_lengths, stewart_3_valid = self.stewart_3dof.solve_batch(level_angles)
+        stewart_6_lengths, stewart_6_valid = self.stewart_6dof.solve_batch(angles)
+
+        # Convert to mm and reduce each test's row in one pass per array
+        tripod_mm, stewart_3_mm, stewart_6_mm = (
+            lengths * 1000 for lengths in (tripod_lengths, stewart_3_lengths, stewart_6_lengths)
+        )
+        tripod_stroke, tripod_max = np.ptp(tripod_mm, axis=1), tripod_mm.max(axis=1)
+        stewart_3_stroke, stewart_3_max = np.ptp(stewart_3_mm, axis=1), stewart_3_mm.max(axis=1)
+        stewart_6_stroke, stewart_6_max = np.ptp(stewart_6_mm, axis=1), stewart_6_mm.max(axis=1)
+
+        # Report each test
+        for i, (roll_deg, pitch_deg, yaw_deg, desc) in enumerate(self.test_angles):
             print(f"\nTest: {desc}")
             print("-" * 60)
 
-            roll = np.deg2rad(roll_deg)
-            pitch = np.deg2rad(pitch_deg)
-            yaw = np.deg2rad(yaw_deg)
-
             # Tripod (no yaw control)
-            lengths_t, valid_t = self.tripod.solve(roll, pitch, 0)
-            stroke_t = np.max(lengths_t) - np.min(lengths_t)
+            lengths_t, valid_t = tripod_mm[i], bool(tripod_valid[i])
+            stroke_t, max_t = tripod_stroke[i], tripod_max[i]
             results["tripod"].append(
                 {
                     "desc": desc,
                     "valid": valid_t,
-                    "lengths": lengths_t * 1000,  # Convert to mm
-                    "stroke_range": stroke_t * 1000,
-                    "max_extension": np.max(lengths_t) * 1000,
+                    "lengths": lengths_t,
+                    "stroke_range": stroke_t,
+                    "max_extension": max_t,
                     "angles": (roll_deg, pitch_deg, 0),
                 }
             )
 
             print(f"  Tripod (3 actuators):")
             if valid_t:
-                print(f"    Lengths: {lengths_t * 1000}")
-                print(f"    Stroke range: {stroke_t * 1000:.1f}mm")
-                print(f"    Max extension: {np.max(lengths_t) * 1000:.1f}mm")
+                print(f"    Lengths: {lengths_t}")
+                print(f"    Stroke range: {stroke_t:.1f}mm")
+                print(f"    Max extension: {max_t:.1f}mm")
             else:
                 print(f"    ✗ INVALID - exceeds actuator limits")
 
             # Stewart 3-DOF
-            lengths_s3, valid_s3 = self.stewart_3dof.solve(roll, pitch, 0)
-            stroke_s3 = np.max(lengths_s3) - np.min(lengths_s3)
+            lengths_s3, valid_s3 = stewart_3_mm[i], bool(stewart_3_valid[i])
+            stroke_s3, max_s3 = stewart_3_stroke[i], stewart_3_max[i]
             results["stewart_3dof"].append(
                 {
                     "desc": desc,
                     "valid": valid_s3,
-                    "lengths": lengths_s3 * 1000,
-                    "stroke_range": stroke_s3 * 1000,
-                    "max_extension": np.max(lengths_s3) * 1000,
+                    "lengths": lengths_s3,
+                    "stroke_range": stroke_s3,
+                    "max_extension": max_s3,
                     "angles": (roll_deg, pitch_deg, 0),
                 }
             )
 
             print(f"  Stewart 3-DOF (6 actuators):")
             if valid_s3:
-                print(f"    Lengths: {lengths_s3 * 1000}")
-                print(f"    Stroke range: {stroke_s3 * 1000:.1f}mm")
-                print(f"    Max extension: {np.max(lengths_s3) * 1000:.1f}mm")
+                print(f"    Lengths: {lengths_s3}")
+                print(f"    Stroke range: {stroke_s3:.1f}mm")
+                print(f"    Max extension: {max_s3:.1f}mm")
             else:
                 print(f"    ✗ INVALID - exceeds actuator limits")
 
             # Stewart 6-DOF (only if yaw != 0)
             if yaw_deg != 0:
-                lengths_s6, valid_s6 = self.stewart_6dof.solve(roll, pitch, yaw)
-                stroke_s6 = np.max(lengths_s6) - np.min(lengths_s6)
+                lengths_s6, valid_s6 = stewart_6_mm[i], bool(stewart_6_valid[i])
+                stroke_s6, max_s6 = stewart_6_stroke[i], stewart_6_max[i]
                 results["stewart_6dof"].append(
                     {
                         "desc": desc,
                         "valid": valid_s6,
-                        "lengths": lengths_s6 * 1000,
-                        "stroke_range": stroke_s6 * 1000,
-                        "max_extension": np.max(lengths_s6) * 1000,
+                        "lengths": lengths_s6,
+                        "stroke_range": stroke_s6,
+                        "max_extension": max_s6,
                         "angles": (roll_deg, pitch_deg, yaw_deg),
                     }
                 )
 
                 print(f"  Stewart 6-DOF (6 actuators with yaw):")
                 if valid_s6:
-                    print(f"    Lengths: {lengths_s6 * 1000}")
-                    print(f"    Stroke range: {stroke_s6 * 1000:.1f}mm")
-                    print(f"    Max extension: {np.max(lengths_s6) * 1000:.1f}mm")
+                    print(f"    Lengths: {lengths_s6}")
+                    print(f"    Stroke range: {stroke_s6:.1f}mm")
+                    print(f"    Max extension: {max_s6:.1f}mm")
                 else:
                     print(f"    ✗ INVALID - exceeds actuator limits")
 
@@ -287,7 +309,9 @@ class PlatformComparison:
         plt.tight_layout()
         plt.savefig("platform_comparison.png", dpi=150, bbox_inches="tight")
         print(f"\nComparison plot saved as 'platform_comparison.png'")
-        plt.show()
+        if plt.get_backend().lower() != "agg":
+            plt.show()
+        plt.close(fig)
 
 
 if __name__ == "__main__":
@@ -3,6 +3,7 @@ Platform Leveling System - GUI Version
 Easy-to-use interface with buttons - no keyboard commands needed!
 """
 
+import math
 import threading
 import time
 import tkinter as tk
@@ -359,13 +360,13 @@ class PlatformLevelingGUI:
                 else:
                     self.yaw_label.config(text=f"Yaw:   {imu_data.yaw:6.2f}° (ignored)")
 
-                tilt_mag = np.sqrt(imu_data.roll**2 + imu_data.pitch**2)
+                tilt_mag = imu_data.tilt_magnitude
                 self.tilt_label.config(text=f"Tilt:  {tilt_mag:6.2f}°")
 
                 # Calculate actuator positions
-                roll_rad = np.deg2rad(imu_data.roll)
-                pitch_rad = np.deg2rad(imu_data.pitch)
-                yaw_rad = np.deg2rad(imu_data.yaw)
+                roll_rad = math.radians(imu_data.roll)
+                pitch_rad = math.radians(imu_data.pitch)
+                yaw_rad = math.radians(imu_data.yaw)
 
                 if self.leveling_enabled:
                     if self.platform_type == "tripod":
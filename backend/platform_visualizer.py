@@ -3,6 +3,7 @@
 Real-time visualization using matplotlib with iPhone IMU data
 """
 
+import math
 import time
 from typing import Optional
 
@@ -253,7 +254,7 @@ class PlatformVisualizer:
             info_lines.append(f"  Yaw:   {imu_data.yaw:7.2f}°")
 
             # Tilt magnitude
-            tilt_mag = np.sqrt(imu_data.roll**2 + imu_data.pitch**2)
+            tilt_mag = imu_data.tilt_magnitude
             info_lines.append(f"  Tilt:  {tilt_mag:7.2f}°")
         else:
             info_lines.append("IMU DATA: Waiting...")
@@ -332,9 +333,9 @@ class PlatformVisualizer:
             self.last_imu_data = imu_data
 
             # Convert to radians
-            roll_rad = np.deg2rad(imu_data.roll)
-            pitch_rad = np.deg2rad(imu_data.pitch)
-            yaw_rad = np.deg2rad(imu_data.yaw)
+            roll_rad = math.radians(imu_data.roll)
+            pitch_rad = math.radians(imu_data.pitch)
+            yaw_rad = math.radians(imu_data.yaw)
 
             # Calculate actuator lengths
             if self.leveling_enabled:
@@ -3,6 +3,7 @@
 Real-time visualization using matplotlib with iPhone IMU data via HTTP
 """
 
+import math
 import time
 from typing import Optional
 
@@ -337,7 +338,7 @@ class PlatformVisualizer:
                 info_lines.append(f"  Yaw:   {imu_data.yaw:7.2f}° (ignored)")
 
             # Tilt magnitude
-            tilt_mag = np.sqrt(imu_data.roll**2 + imu_data.pitch**2)
+            tilt_mag = imu_data.tilt_magnitude
             info_lines.append(f"  Tilt:  {tilt_mag:7.2f}°")
             info_lines.append(f"  Age:   {data_age:7.2f}s")
         else:
@@ -426,9 +427,9 @@ class PlatformVisualizer:
             self.last_imu_data = imu_data
 
             # Convert to radians
-            roll_rad = np.deg2rad(imu_data.roll)
-            pitch_rad = np.deg2rad(imu_data.pitch)
-            yaw_rad = np.deg2rad(imu_data.yaw)
+            roll_rad = math.radians(imu_data.roll)
+            pitch_rad = math.radians(imu_data.pitch)
+            yaw_rad = math.radians(imu_data.yaw)
 
             # Calculate actuator lengths
             if self.leveling_enabled:
@@ -2,10 +2,12 @@
 API endpoint tests for Platform Leveling System
 """
 
+import numpy as np
 import pytest
 from fastapi.testclient import TestClient
 
-from api import app
+from api import PoseRequest, app, get_geometry_arrays, solve_ik
+from config import settings
 
 client = TestClient(app)
 
@@ -85,6 +87,17 @@ class TestIKCalculation:
         assert data["valid"] is True
         assert data["configuration"] == "6-3"
 
+    def test_neutral_pose_leg_lengths(self):
+        # 3-3: each platform point sits 60 degrees past its base point, so with
+        # 120/70 mm radii and a 150 mm nominal height every leg is equally long
+        geometry = {"base_radius": 120.0, "platform_radius": 70.0, "nominal_leg_length": 150.0}
+        response = client.post("/calculate", json={"configuration": "3-3", "geometry": geometry})
+        assert response.status_code == 200
+        data = response.json()
+        dr_sq = 120.0**2 + 70.0**2 - 2 * 120.0 * 70.0 * np.cos(np.pi / 3)
+        assert data["leg_lengths"] == pytest.approx([np.sqrt(dr_sq + 150.0**2)] * 3, rel=1e-5)
+        assert data["valid"] is True
+
     def test_calculate_with_translation(self):
         pose = {
             "x": 10.0,
@@ -210,3 +223,154 @@ class TestInputValidation:
         }
         response = client.post("/calculate", json=pose)
         assert response.status_code == 422
+
+
+class TestGeometryArrays:
+    """Test the cached geometry arrays fed to the IK kernels"""
+
+    def test_points_are_read_only_float32(self):
+        base_points, platform_points, leg_pairs = get_geometry_arrays("6-3", 120.0, 70.0)
+        assert base_points.dtype == np.float32
+        assert platform_points.dtype == np.float32
+        assert base_points.shape == (3, 6)
+        assert platform_points.shape == (3, 3)
+        assert not base_points.flags.writeable
+        assert not platform_points.flags.writeable
+        assert not leg_pairs.flags.writeable
+
+    def test_lengths_are_float64(self):
+        lengths, _, _ = solve_ik(PoseRequest(roll=5.0, configuration="8-8"))
+        assert lengths.dtype == np.float64
+        assert len(lengths) == 8
+
+
+class TestWebSocket:
+    """Test the real-time WebSocket endpoint"""
+
+    def test_text_frame_round_trip(self):
+        pose = {"roll": 5.0, "pitch": -3.0, "configuration": "6-3"}
+        with client.websocket_connect("/ws") as ws:
+            ws.send_json(pose)
+            data = ws.receive_json()
+        assert len(data["leg_lengths"]) == 6
+        assert data["configuration"] == "6-3"
+        assert data["pose"]["roll"] == 5.0
+
+    def test_binary_frame_round_trip(self):
+        with client.websocket_connect("/ws") as ws:
+            ws.send_bytes(b'{"roll": 5.0, "pitch": -3.0, "configuration": "8-8"}')
+            data = ws.receive_json(mode="binary")
+        assert len(data["leg_lengths"]) == 8
+
+    def test_matches_rest_result(self):
+        pose = {"x": 4.0, "z": 12.0, "roll": 7.5, "yaw": 30.0, "configuration": "6-6"}
+        rest = client.post("/calculate", json=pose).json()
+        with client.websocket_connect("/ws") as ws:
+            ws.send_json(pose)
+            data = ws.receive_json()
+        assert data["leg_lengths"] == rest["leg_lengths"]
+        assert data["valid"] == rest["valid"]
+
+    def test_invalid_frame_keeps_connection(self):
+        with client.websocket_connect("/ws") as ws:
+            ws.send_json({"roll": 200.0})
+            error = ws.receive_json()
+            ws.send_bytes(b"{not json")
+            binary_error = ws.receive_json(mode="binary")
+            ws.send_json({"roll": 5.0, "configuration": "6-3"})
+            data = ws.receive_json()
+        assert "roll" in error["error"]
+        assert "error" in binary_error
+        assert len(data["leg_lengths"]) == 6
+
+    def test_geometry_change_mid_stream(self):
+        custom = {
+            "base_radius": 150.0,
+            "platform_radius": 80.0,
+            "nominal_leg_length": 200.0,
+            "min_leg_length": 150.0,
+            "max_leg_length": 250.0,
+        }
+        poses = [
+            {"roll": 5.0, "configuration": "6-3"},
+            {"roll": 5.0, "configuration": "6-3", "geometry": custom},
+            {"roll": 5.0, "configuration": "8-8", "geometry": custom},
+            {"roll": 5.0, "configuration": "6-3"},
+        ]
+        with client.websocket_connect("/ws") as ws:
+            for pose in poses:
+                ws.send_json(pose)
+                data = ws.receive_json()
+                rest = client.post("/calculate", json=pose).json()
+                assert data["leg_lengths"] == rest["leg_lengths"]
+
+
+class TestFastCalculation:
+    """Test the msgspec-decoded /calculate_fast endpoint"""
+
+    def test_matches_calculate(self):
+        pose = {"x": 4.0, "z": 12.0, "roll": 7.5, "yaw": 30.0, "configuration": "6-6"}
+        response = client.post("/calculate_fast", json=pose)
+        assert response.status_code == 200
+        data = response.json()
+        rest = client.post("/calculate", json=pose).json()
+        assert data["leg_lengths"] == rest["leg_lengths"]
+        assert data["valid"] == rest["valid"]
+        assert data["cached"] is False
+
+    def test_rejects_out_of_range_pose(self):
+        response = client.post("/calculate_fast", json={"roll": 200.0})
+        assert response.status_code == 422
+
+    def test_rejects_malformed_body(self):
+        response = client.post("/calculate_fast", content=b"{not json")
+        assert response.status_code == 422
+
+
+class TestBatchCalculation:
+    """Test the batched inverse kinematics endpoint"""
+
+    def test_batch_matches_single_calculations(self):
+        poses = [
+            {"roll": 5.0, "pitch": -3.0, "configuration": "6-3"},
+            {"x": 10.0, "z": 5.0, "yaw": 20.0, "configuration": "8-8"},
+            {"roll": -12.0, "pitch": 7.0, "yaw": -45.0, "configuration": "6-3"},
+            {
+                "roll": 3.0,
+                "configuration": "6-3",
+                "geometry": {
+                    "base_radius": 150.0,
+                    "platform_radius": 80.0,
+                    "nominal_leg_length": 200.0,
+                    "min_leg_length": 150.0,
+                    "max_leg_length": 250.0,
+                },
+            },
+        ]
+        response = client.post("/calculate_batch", json=poses)
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["leg_lengths"]) == len(poses)
+        assert len(data["valid"]) == len(poses)
+
+        for pose, lengths, valid in zip(poses, data["leg_lengths"], data["valid"]):
+            single = client.post("/calculate", json=pose).json()
+            assert lengths == pytest.approx(single["leg_lengths"], abs=1e-9)
+            assert valid == single["valid"]
+
+    def test_large_batch_matches_small_batch(self):
+        poses = [{"roll": (i % 20) - 10.0, "yaw": float(i % 90)} for i in range(300)]
+        large = client.post("/calculate_batch", json=poses).json()
+        small = client.post("/calculate_batch", json=poses[:10]).json()
+        assert len(large["leg_lengths"]) == 300
+        assert large["leg_lengths"][:10] == small["leg_lengths"]
+
+    def test_batch_size_is_capped(self):
+        assert client.post("/calculate_batch", json=[]).status_code == 422
+        too_many = [{"roll": 0.0}] * (settings.max_batch_size + 1)
+        assert client.post("/calculate_batch", json=too_many).status_code == 422
+
+    def test_batch_rejects_invalid_pose(self):
+        poses = [{"roll": 0.0}, {"roll": 200.0}]
+        response = client.post("/calculate_batch", json=poses)
+        assert response.status_code == 422
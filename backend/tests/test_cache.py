@@ -0,0 +1,41 @@
+"""
+Tests for the caching helpers
+"""
+
+from api import PlatformConfigModel, PoseRequest
+from cache import generate_ik_cache_key
+
+DEFAULT_GEOMETRY = PlatformConfigModel()
+
+
+class TestIKCacheKey:
+    """Test the packed IK cache key"""
+
+    def test_same_pose_same_key(self):
+        pose = {"x": 1.0, "roll": 5.0, "configuration": "6-6"}
+        assert generate_ik_cache_key(
+            PoseRequest(**pose), DEFAULT_GEOMETRY
+        ) == generate_ik_cache_key(PoseRequest(**pose), DEFAULT_GEOMETRY)
+
+    def test_key_covers_every_field(self):
+        base = PoseRequest(roll=5.0)
+        variants = [
+            PoseRequest(roll=5.0, x=0.5),
+            PoseRequest(roll=5.0, yaw=0.5),
+            PoseRequest(roll=5.0, configuration="8-8"),
+            PoseRequest(roll=5.0, geometry=PlatformConfigModel()),
+            PoseRequest(roll=5.0, geometry=PlatformConfigModel(base_radius=121.0)),
+        ]
+        keys = {generate_ik_cache_key(pose, DEFAULT_GEOMETRY) for pose in [base] + variants}
+        assert len(keys) == len(variants) + 1
+        assert all(key.startswith("ik:") for key in keys)
+
+    def test_key_covers_default_geometry(self):
+        pose = PoseRequest(roll=5.0)
+        updated = PlatformConfigModel(nominal_leg_length=200.0)
+        assert generate_ik_cache_key(pose, DEFAULT_GEOMETRY) != generate_ik_cache_key(pose, updated)
+
+    def test_own_geometry_ignores_default(self):
+        pose = PoseRequest(roll=5.0, geometry=PlatformConfigModel(base_radius=121.0))
+        updated = PlatformConfigModel(nominal_leg_length=200.0)
+        assert generate_ik_cache_key(pose, DEFAULT_GEOMETRY) == generate_ik_cache_key(pose, updated)
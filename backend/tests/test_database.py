@@ -0,0 +1,235 @@
+"""
+Tests for database logging and API key lookups
+"""
+
+import threading
+import time
+
+import pytest
+from sqlalchemy.pool import StaticPool
+
+import database
+from config import settings
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Initialize a throwaway SQLite database and stop the writer afterwards"""
+    monkeypatch.setattr(settings, "database_enabled", True)
+    monkeypatch.setattr(settings, "database_url", f"sqlite:///{tmp_path / 'test.db'}")
+    database.init_db()
+    yield
+    database.close_db()
+
+
+def add_api_key(key, is_active=True):
+    session = database.SessionLocal()
+    try:
+        session.add(
+            database.APIKey(
+                key_hash=database.hash_api_key(key), name=f"{key} client", is_active=is_active
+            )
+        )
+        session.commit()
+    finally:
+        session.close()
+
+
+def get_api_key(key):
+    session = database.SessionLocal()
+    try:
+        return session.query(database.APIKey).filter_by(key_hash=database.hash_api_key(key)).one()
+    finally:
+        session.close()
+
+
+class TestSQLiteTuning:
+    """Test the pragmas applied to SQLite connections"""
+
+    def test_wal_mode_is_enabled(self, db):
+        with database.engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+
+    def test_file_database_is_pooled(self, db):
+        assert not isinstance(database.engine.pool, StaticPool)
+
+    def test_memory_database_shares_one_connection(self, monkeypatch):
+        monkeypatch.setattr(settings, "database_enabled", True)
+        monkeypatch.setattr(settings, "database_url", "sqlite://")
+        database.init_db()
+        try:
+            assert isinstance(database.engine.pool, StaticPool)
+        finally:
+            database.close_db()
+
+
+class TestCalculationLog:
+    """Test the batched calculation log writer"""
+
+    def test_queued_logs_are_written(self, db):
+        count = database.LOG_BATCH_SIZE * 2 + 50
+        for i in range(count):
+            assert database.log_calculation(
+                "6-3",
+                {"x": float(i), "roll": 1.0},
+                {"valid": True, "leg_lengths": [150.0] * 6},
+                0.1,
+                {"user_agent": "pytest", "ip": "127.0.0.1"},
+            )
+        database.close_db()
+
+        session = database.SessionLocal()
+        try:
+            rows = session.query(database.CalculationLog).order_by(database.CalculationLog.id).all()
+        finally:
+            session.close()
+        assert len(rows) == count
+        assert [row.pose_x for row in rows] == [float(i) for i in range(count)]
+        assert len(rows[0].leg_lengths) == 6 * 4
+        assert database.decode_leg_lengths(rows[0].leg_lengths).tolist() == [150.0] * 6
+        assert rows[0].timestamp is not None
+        assert rows[0].ip_address == "127.0.0.1"
+
+    def test_writer_runs_alongside_concurrent_sessions(self, db):
+        add_api_key("busy-key")
+        count = 5000
+        errors = []
+
+        def reader(n):
+            try:
+                for i in range(200):
+                    # Cache misses, so every call queries the database
+                    database.invalidate_api_key("busy-key")
+                    assert database.lookup_api_key("busy-key") is not None
+                    assert database.lookup_api_key(f"unknown-{n}-{i}") is None
+                    session = database.SessionLocal()
+                    try:
+                        session.query(database.CalculationLog).count()
+                    finally:
+                        session.close()
+            except Exception as e:
+                errors.append(e)
+
+        readers = [threading.Thread(target=reader, args=(n,)) for n in range(4)]
+        for thread in readers:
+            thread.start()
+        for i in range(count):
+            assert database.log_calculation("6-3", {"x": float(i)}, {"valid": True}, 0.1)
+        for thread in readers:
+            thread.join()
+        database.close_db()
+
+        assert errors == []
+        session = database.SessionLocal()
+        try:
+            assert session.query(database.CalculationLog).count() == count
+        finally:
+            session.close()
+        assert get_api_key("busy-key").usage_count == 800
+
+    def test_failed_batch_is_retried(self, db, monkeypatch):
+        begin = database.engine.begin
+        failures = []
+
+        def flaky_begin():
+            if not failures:
+                failures.append(True)
+                raise RuntimeError("database is locked")
+            return begin()
+
+        monkeypatch.setattr(database, "LOG_FLUSH_INTERVAL", 0.05)
+        monkeypatch.setattr(database.engine, "begin", flaky_begin)
+        for i in range(10):
+            database.log_calculation("6-3", {"x": float(i)}, {"valid": True}, 0.1)
+        database.close_db()
+
+        assert failures == [True]
+        session = database.SessionLocal()
+        try:
+            assert session.query(database.CalculationLog).count() == 10
+        finally:
+            session.close()
+
+    def test_valid_results_are_sampled(self, db, monkeypatch):
+        monkeypatch.setattr(settings, "log_sampling", 0.25)
+        monkeypatch.setattr(database, "_sample_credit", 0.0)
+        for i in range(100):
+            database.log_calculation("6-3", {"x": float(i)}, {"valid": True}, 0.1)
+        for i in range(3):
+            database.log_calculation("6-3", {"x": -1.0}, {"valid": False}, 0.1)
+        database.close_db()
+
+        session = database.SessionLocal()
+        try:
+            rows = session.query(database.CalculationLog).all()
+        finally:
+            session.close()
+        assert sum(row.result_valid for row in rows) == 25
+        assert sum(not row.result_valid for row in rows) == 3
+
+
+class TestAPIKeyLookup:
+    """Test cached API key lookups"""
+
+    def test_known_key_is_cached(self, db):
+        add_api_key("cached-key")
+        info = database.lookup_api_key("cached-key")
+        assert info[1:] == ("cached-key client", True)
+
+        session = database.SessionLocal()
+        session.query(database.APIKey).filter_by(
+            key_hash=database.hash_api_key("cached-key")
+        ).delete()
+        session.commit()
+        session.close()
+        assert database.lookup_api_key("cached-key") == info
+
+        database.invalidate_api_key("cached-key")
+        assert database.lookup_api_key("cached-key") is None
+
+    def test_unknown_key_is_negatively_cached(self, db):
+        assert database.lookup_api_key("late-key") is None
+        add_api_key("late-key")
+        assert database.lookup_api_key("late-key") is None
+
+        database.invalidate_api_key("late-key")
+        assert database.lookup_api_key("late-key") is not None
+
+    def test_usage_is_written_in_batches(self, db):
+        add_api_key("busy-key")
+        add_api_key("disabled-key", is_active=False)
+        for _ in range(5):
+            database.lookup_api_key("busy-key")
+            database.lookup_api_key("disabled-key")
+        database.close_db()
+
+        busy = get_api_key("busy-key")
+        assert busy.usage_count == 5
+        assert busy.last_used_at is not None
+        assert get_api_key("disabled-key").usage_count == 0
+
+    def test_created_key_is_stored_hashed(self, db):
+        key, info = database.create_api_key("new client")
+        stored = get_api_key(key)
+        assert stored.id == info[0]
+        assert stored.key_hash == database.hash_api_key(key)
+        assert key not in stored.key_hash
+
+        # Pre-warmed: found even after the row is gone
+        session = database.SessionLocal()
+        session.query(database.APIKey).delete()
+        session.commit()
+        session.close()
+        assert database.lookup_api_key(key) == info
+
+    def test_usage_is_flushed_periodically(self, db, monkeypatch):
+        database.close_db()
+        monkeypatch.setattr(settings, "api_key_usage_flush_interval", 0.1)
+        database.init_db()
+
+        add_api_key("periodic-key")
+        database.lookup_api_key("periodic-key")
+        time.sleep(database.LOG_FLUSH_INTERVAL * 3)
+
+        assert get_api_key("periodic-key").usage_count == 1
@@ -0,0 +1,116 @@
+"""
+Tests for the simulated ESP32 actuator controller
+"""
+
+import asyncio
+import struct
+
+import pytest
+
+from esp32_controller import ESP32Controller, SerialProtocol
+
+
+@pytest.fixture
+def controller():
+    controller = ESP32Controller(num_actuators=3, min_position_mm=300, max_position_mm=700)
+    controller.set_speed(50.0)
+    return controller
+
+
+class TestActuatorUpdate:
+    """Test the vectorized actuator update"""
+
+    def test_moves_toward_targets_at_speed(self, controller):
+        controller.enable_actuators(True)
+        controller.set_targets([310.0, 300.2, 400.0])
+        controller._update_actuators(0.1)
+
+        status = controller.get_status()
+        # 5mm per tick at 50 mm/s; the second actuator is within the 0.5mm deadband
+        assert status["positions"] == [305.0, 300.0, 305.0]
+        assert status["currents"] == pytest.approx([1.0, 0.0, 1.0])
+        assert status["limit_min"] == [False, True, False]
+
+    def test_disabled_actuators_hold(self, controller):
+        controller.enable_actuators(True)
+        controller.actuators[1].enabled = False
+        controller.set_targets([400.0, 400.0, 400.0])
+        controller._update_actuators(0.1)
+
+        assert controller.get_positions() == [305.0, 300.0, 305.0]
+
+    def test_stops_at_max_limit(self, controller):
+        controller.enable_actuators(True)
+        controller.actuators[0].position = 698.0
+        controller.set_targets([700.0, 300.0, 300.0])
+        controller._update_actuators(0.1)
+
+        assert controller.actuators[0].position == 700.0
+        assert controller.actuators[0].limit_max is True
+
+    def test_targets_are_clamped(self, controller):
+        controller.set_targets([100.0, 500.0, 900.0])
+        assert controller.get_status()["targets"] == [300.0, 500.0, 700.0]
+
+    def test_position_callback_only_on_movement(self, controller):
+        calls = []
+        controller.position_callback = lambda positions: calls.append(positions.tolist())
+        controller._tick(0.1)
+        controller._tick(0.1)
+        assert calls == [[300.0, 300.0, 300.0]]
+
+        controller.enable_actuators(True)
+        controller.set_targets([310.0, 300.0, 300.0])
+        controller._tick(0.1)
+        controller._tick(0.1)
+        controller._tick(0.1)
+        assert calls[1:] == [[305.0, 300.0, 300.0], [310.0, 300.0, 300.0]]
+
+
+class TestEventLoopMode:
+    """Test running the control loop as an asyncio task"""
+
+    def test_task_moves_actuators(self, controller):
+        async def run():
+            controller.enable_actuators(True)
+            controller.set_targets([400.0, 400.0, 400.0])
+            controller.start(asyncio.get_running_loop())
+            await asyncio.sleep(0.1)
+            controller.stop()
+
+        asyncio.run(run())
+        assert controller.task is None
+        assert all(300.0 < p < 400.0 for p in controller.get_positions())
+
+
+class TestSerialProtocol:
+    """Test command framing and simulated execution"""
+
+    def test_packet_framing(self, controller):
+        class Recorder:
+            def write(self, packet):
+                self.packet = bytes(packet)
+
+        protocol = SerialProtocol(controller)
+        protocol.serial_conn = Recorder()
+        protocol.send_command(ESP32Controller.CMD_ENABLE, b"\x01")
+
+        header = bytes([0xAA, ESP32Controller.CMD_ENABLE, 1, 1])
+        assert protocol.serial_conn.packet == header + bytes([sum(header) & 0xFF])
+
+    def test_simulated_commands(self, controller):
+        protocol = SerialProtocol(controller)
+        protocol.send_command(ESP32Controller.CMD_SET_TARGET, struct.pack("3f", 350, 400, 375))
+        protocol.send_command(ESP32Controller.CMD_SET_SPEED, struct.pack("f", 12.5))
+        protocol.send_command(ESP32Controller.CMD_ENABLE, struct.pack("B", 1))
+
+        status = controller.get_status()
+        assert status["targets"] == [350.0, 400.0, 375.0]
+        assert status["enabled"] == [True, True, True]
+        assert controller.actuators[0].speed == 12.5
+
+    def test_simulated_responses(self, controller):
+        protocol = SerialProtocol(controller)
+        ack = protocol.send_command(ESP32Controller.CMD_ENABLE, struct.pack("B", 0))
+        assert ack == ESP32Controller.RESP_ACK
+        assert protocol.send_command(0x7F) == ESP32Controller.RESP_ERROR
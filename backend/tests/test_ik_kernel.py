@@ -0,0 +1,152 @@
+"""
+Tests for the compiled inverse kinematics kernels
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from ik_kernel import ik_batch_kernel, ik_kernel, make_ik_kernel, rotation_zyx
+
+
+def reference_rotation(roll, pitch, yaw):
+    """Rz @ Ry @ Rx built from the elementary rotations"""
+    Rx = np.array([[1, 0, 0], [0, np.cos(roll), -np.sin(roll)], [0, np.sin(roll), np.cos(roll)]])
+    Ry = np.array(
+        [[np.cos(pitch), 0, np.sin(pitch)], [0, 1, 0], [-np.sin(pitch), 0, np.cos(pitch)]]
+    )
+    Rz = np.array([[np.cos(yaw), -np.sin(yaw), 0], [np.sin(yaw), np.cos(yaw), 0], [0, 0, 1]])
+    return Rz @ Ry @ Rx
+
+
+ANGLES = [
+    (0.0, 0.0, 0.0),
+    (10.0, -5.0, 0.0),
+    (-30.0, 25.0, 90.0),
+    (45.0, 45.0, -135.0),
+]
+
+
+class TestRotation:
+    """Test the closed-form rotation matrix"""
+
+    @pytest.mark.parametrize("roll,pitch,yaw", ANGLES)
+    def test_matches_elementary_product(self, roll, pitch, yaw):
+        r, p, y = math.radians(roll), math.radians(pitch), math.radians(yaw)
+        R = np.array(rotation_zyx(r, p, y)).reshape(3, 3)
+        assert np.allclose(R, reference_rotation(r, p, y), atol=1e-12)
+
+
+def tripod_geometry():
+    """6-3 style float32 geometry as (base, platform, leg_pairs) in AoS layout"""
+    angles = np.arange(6) * np.pi / 3
+    base = np.stack([120 * np.cos(angles), 120 * np.sin(angles), np.zeros(6)], axis=1)
+    plat_angles = np.arange(3) * 2 * np.pi / 3 + np.pi / 3
+    plat = np.stack([70 * np.cos(plat_angles), 70 * np.sin(plat_angles), np.full(3, 150.0)], axis=1)
+    pairs = np.array([0, 0, 1, 1, 2, 2], dtype=np.intp)
+    return base.astype(np.float32), plat.astype(np.float32), pairs
+
+
+def run_kernel(base, plat, pairs, angles, translation, min_len=0.0, max_len=1e9):
+    """Call ik_kernel with AoS test geometry converted to its SoA layout"""
+    return ik_kernel(
+        np.ascontiguousarray(base.T),
+        np.ascontiguousarray(plat.T),
+        pairs,
+        *angles,
+        *translation,
+        min_len,
+        max_len,
+    )
+
+
+class TestIKKernel:
+    """Test the single-pose leg length kernel"""
+
+    @pytest.mark.parametrize("roll,pitch,yaw", ANGLES)
+    def test_matches_numpy_reference(self, roll, pitch, yaw):
+        base, plat, pairs = tripod_geometry()
+        angles = (math.radians(roll), math.radians(pitch), math.radians(yaw))
+
+        lengths, _ = run_kernel(base, plat, pairs, angles, (5.0, -3.0, 160.0))
+
+        expected = np.linalg.norm(
+            plat[pairs].astype(np.float64) @ reference_rotation(*angles).T
+            + np.array([5.0, -3.0, 160.0])
+            - base,
+            axis=1,
+        )
+        assert np.allclose(lengths, expected, atol=1e-9)
+
+    def test_validity_follows_limits(self):
+        base, plat, pairs = tripod_geometry()
+        lengths, _ = run_kernel(base, plat, pairs, (0.1, -0.2, 0.3), (0.0, 0.0, 150.0))
+
+        _, valid = run_kernel(
+            base, plat, pairs, (0.1, -0.2, 0.3), (0.0, 0.0, 150.0), lengths.min(), lengths.max()
+        )
+        assert valid
+
+        _, valid = run_kernel(
+            base, plat, pairs, (0.1, -0.2, 0.3), (0.0, 0.0, 150.0), lengths.min() + 1e-6, 1e9
+        )
+        assert not valid
+
+
+class TestSpecializedKernel:
+    """Test the per-layout kernels with leg_pairs baked in"""
+
+    @pytest.mark.parametrize("roll,pitch,yaw", ANGLES)
+    def test_matches_generic_kernel(self, roll, pitch, yaw):
+        base, plat, pairs = tripod_geometry()
+        angles = (math.radians(roll), math.radians(pitch), math.radians(yaw))
+        expected, expected_valid = run_kernel(base, plat, pairs, angles, (5.0, -3.0, 160.0))
+
+        out = np.full(8, np.nan)
+        valid = make_ik_kernel(tuple(pairs.tolist()))(
+            np.ascontiguousarray(base.T),
+            np.ascontiguousarray(plat.T),
+            *angles,
+            5.0,
+            -3.0,
+            160.0,
+            0.0,
+            1e9,
+            out,
+        )
+        assert np.array_equal(out[:6], expected)
+        assert valid == expected_valid
+        assert np.isnan(out[6:]).all()
+
+    def test_kernels_are_shared_per_layout(self):
+        assert make_ik_kernel((0, 1, 2)) is make_ik_kernel((0, 1, 2))
+        assert make_ik_kernel((0, 1, 2)) is not make_ik_kernel((0, 0, 1, 1, 2, 2))
+
+
+class TestIKBatchKernel:
+    """Test the parallel batch kernel"""
+
+    def test_matches_single_pose_kernel(self):
+        base, plat, pairs = tripod_geometry()
+        rng = np.random.default_rng(0)
+        angles = np.radians(rng.uniform(-30, 30, size=(64, 3)))
+        translations = rng.uniform(-20, 20, size=(64, 3)) + [0.0, 0.0, 150.0]
+
+        lengths, valid = ik_batch_kernel(
+            np.ascontiguousarray(base.T),
+            np.ascontiguousarray(plat.T),
+            pairs,
+            angles,
+            translations,
+            130.0,
+            190.0,
+        )
+
+        assert lengths.shape == (64, 6)
+        for b in range(64):
+            expected, expected_valid = run_kernel(
+                base, plat, pairs, angles[b], translations[b], 130.0, 190.0
+            )
+            assert np.array_equal(lengths[b], expected)
+            assert valid[b] == expected_valid
@@ -0,0 +1,81 @@
+"""
+Tests for the UDP IMU streamer
+"""
+
+import asyncio
+import math
+import socket
+import struct
+import time
+
+import pytest
+
+from imu_streamer import IMUStreamer
+
+
+@pytest.fixture
+def streamer():
+    return IMUStreamer(host="127.0.0.1", port=0)
+
+
+def send(streamer, payload: bytes):
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sender.sendto(payload, streamer.socket.getsockname())
+    finally:
+        sender.close()
+
+
+class TestIMUStreamer:
+    """Test receiving IMU datagrams in thread and event loop modes"""
+
+    def test_thread_mode(self, streamer):
+        streamer.start()
+        send(streamer, b'{"roll": 1.5, "pitch": -2.0, "yaw": 3.0}')
+        time.sleep(0.2)
+        streamer.stop()
+
+        data = streamer.get_latest()
+        assert (data.roll, data.pitch, data.yaw) == (1.5, -2.0, 3.0)
+
+    def test_event_loop_mode(self, streamer):
+        async def run():
+            streamer.start(asyncio.get_running_loop())
+            await asyncio.sleep(0.05)
+            send(streamer, b'{"attitude": {"roll": 4.0, "pitch": 5.0, "yaw": 6.0}}')
+            await asyncio.sleep(0.1)
+            streamer.stop()
+
+        asyncio.run(run())
+        data = streamer.get_latest()
+        assert (data.roll, data.pitch, data.yaw) == (4.0, 5.0, 6.0)
+
+    def test_binary_packet_in_radians(self, streamer):
+        streamer._parse_data(struct.pack("fff", 0.5, -0.25, 1.0))
+        data = streamer.get_latest()
+        assert (data.roll, data.pitch, data.yaw) == pytest.approx(
+            (math.degrees(0.5), math.degrees(-0.25), math.degrees(1.0))
+        )
+        assert data.to_radians() == pytest.approx([0.5, -0.25, 1.0])
+        assert data.tilt_magnitude == pytest.approx(math.hypot(data.roll, data.pitch))
+        streamer.stop()
+
+    def test_burst_keeps_newest_packet(self, streamer):
+        for roll in (1.0, 2.0, 3.0):
+            send(streamer, b'{"roll": %.1f, "pitch": 0.0}' % roll)
+        time.sleep(0.05)
+        streamer.start()
+        time.sleep(0.2)
+        streamer.stop()
+
+        assert streamer.get_latest().roll == 3.0
+
+    def test_on_sample_called_per_sample(self, streamer):
+        samples = []
+        streamer.on_sample = lambda: samples.append(streamer.get_latest().roll)
+        streamer._parse_data(b'{"roll": 1.0, "pitch": 0.0}')
+        streamer._parse_data(b"{bad")
+        streamer._parse_data(struct.pack("fff", 0.0, 0.0, 0.0))
+        streamer.stop()
+
+        assert samples == [1.0, 0.0]
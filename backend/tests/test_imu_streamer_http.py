@@ -0,0 +1,179 @@
+"""
+Tests for the HTTP IMU receiver
+"""
+
+import http.client
+import json
+import math
+import urllib.error
+import urllib.request
+from collections import deque
+
+import numpy as np
+import pytest
+
+from imu_streamer_http import IMUHTTPHandler, IMUHTTPStreamer, quaternions_to_euler
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """Run an IMUHTTPStreamer on a free local port with fresh shared state"""
+    monkeypatch.setattr(IMUHTTPHandler, "latest_data", None)
+    monkeypatch.setattr(IMUHTTPHandler, "history", deque(maxlen=64))
+    monkeypatch.setattr(IMUHTTPHandler, "_orientation_index", 0)
+    monkeypatch.setattr(IMUHTTPHandler, "_first_message_printed", True)
+    streamer = IMUHTTPStreamer(host="127.0.0.1", port=0)
+    streamer.start()
+    yield streamer.server
+    streamer.stop()
+
+
+def post(server, payload) -> int:
+    body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{server.server_address[1]}/imu", data=body, method="POST"
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def latest_angles():
+    data = IMUHTTPHandler.latest_data
+    return data.roll, data.pitch, data.yaw
+
+
+class TestIMUHTTPHandler:
+    """Test orientation extraction from the supported payload formats"""
+
+    def test_sensor_logger_payload(self, server):
+        payload = {
+            "messageId": 1,
+            "payload": [
+                {"name": "accelerometer", "values": {"x": 0.1, "y": 0.2, "z": 9.8}},
+                {"name": "orientation", "values": {"roll": 0.1, "pitch": -0.2, "yaw": 0.3}},
+            ],
+        }
+        assert post(server, payload) == 200
+        assert latest_angles() == pytest.approx(
+            (math.degrees(0.1), math.degrees(-0.2), math.degrees(0.3))
+        )
+
+    def test_sensor_logger_layout_change(self, server):
+        accelerometer = {"name": "accelerometer", "values": {"x": 0.1, "y": 0.2, "z": 9.8}}
+        gravity = {"name": "gravity", "values": {"x": 0.0, "y": 0.0, "z": 9.8}}
+        for i, layout in enumerate([(accelerometer, gravity, None), (None, gravity), (None,)]):
+            orientation = {"name": "orientation", "values": {"roll": 0.1 * i}}
+            payload = [orientation if item is None else item for item in layout]
+            assert post(server, {"payload": payload}) == 200
+            assert IMUHTTPHandler.latest_data.roll == pytest.approx(math.degrees(0.1 * i))
+        assert IMUHTTPHandler._orientation_index == 0
+
+    def test_direct_degrees(self, server):
+        assert post(server, {"roll": 1.5, "pitch": -2.0, "yaw": 3.0}) == 200
+        assert latest_angles() == (1.5, -2.0, 3.0)
+
+    def test_quaternion(self, server):
+        half = math.radians(30.0) / 2
+        quaternion = {"w": math.cos(half), "x": math.sin(half), "y": 0.0, "z": 0.0}
+        assert post(server, {"quaternion": quaternion}) == 200
+        assert latest_angles() == pytest.approx((30.0, 0.0, 0.0))
+
+    def test_accelerometer_tilt(self, server):
+        assert post(server, {"accelerometer": {"x": 0.0, "y": 1.0, "z": 1.0}}) == 200
+        assert latest_angles() == pytest.approx((45.0, 0.0, 0.0))
+        assert IMUHTTPHandler.latest_data.tilt_magnitude == pytest.approx(45.0)
+
+    def test_connection_is_reused(self, server):
+        connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1])
+        try:
+            for roll in (1.0, 2.0, 3.0):
+                connection.request("POST", "/imu", body=json.dumps({"roll": roll, "pitch": 0.0}))
+                response = connection.getresponse()
+                assert response.status == 200
+                assert json.loads(response.read()) == {"status": "ok"}
+            sock = connection.sock
+            connection.request("GET", "/status")
+            assert json.loads(connection.getresponse().read())["roll"] == 3.0
+            assert connection.sock is sock
+        finally:
+            connection.close()
+
+    def test_unknown_path_closes_connection(self, server):
+        connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1])
+        try:
+            body = b"GET /status HTTP/1.1\r\n\r\n"
+            connection.request("POST", "/wrong", body=body)
+            response = connection.getresponse()
+            assert response.status == 404
+            response.read()
+            assert response.will_close
+
+            # The unread body must not be served as a second request
+            connection.request("POST", "/imu", body=json.dumps({"roll": 1.0, "pitch": 0.0}))
+            assert connection.getresponse().status == 200
+        finally:
+            connection.close()
+        assert IMUHTTPHandler.latest_data.roll == 1.0
+
+    def test_malformed_body(self, server):
+        assert post(server, b"{not json") == 400
+        assert IMUHTTPHandler.latest_data is None
+
+    def test_status(self, server):
+        url = f"http://127.0.0.1:{server.server_address[1]}/status"
+        with urllib.request.urlopen(url) as response:
+            assert json.load(response) == {"status": "waiting"}
+
+        post(server, {"roll": 1.5, "pitch": -2.0, "yaw": 3.0})
+        with urllib.request.urlopen(url) as response:
+            status = json.load(response)
+        assert status["status"] == "receiving"
+        assert (status["roll"], status["pitch"], status["yaw"]) == (1.5, -2.0, 3.0)
+
+    def test_oversized_body(self, server, monkeypatch):
+        monkeypatch.setattr(IMUHTTPHandler, "max_body_size", 16)
+        assert post(server, {"roll": 1.5, "pitch": -2.0, "yaw": 3.0}) == 413
+        assert IMUHTTPHandler.latest_data is None
+
+    def test_calibration_uses_one_sample(self, server, monkeypatch):
+        monkeypatch.setattr(IMUHTTPHandler, "offsets", (0.0, 0.0, 0.0))
+        post(server, {"roll": 1.5, "pitch": -2.0, "yaw": 3.0})
+        streamer = IMUHTTPStreamer(host="127.0.0.1", port=0)
+        streamer.calibrate()
+
+        post(server, {"roll": 2.5, "pitch": -2.0, "yaw": 3.0})
+        assert latest_angles() == (1.0, 0.0, 0.0)
+        assert streamer.get_tilt_angles() == (1.0, 0.0)
+        assert IMUHTTPHandler.offsets == (1.5, -2.0, 3.0)
+
+    def test_samples_are_kept_in_order(self, server):
+        for roll in (1.0, 2.0, 3.0):
+            post(server, {"roll": roll, "pitch": 0.0})
+        streamer = IMUHTTPStreamer(host="127.0.0.1", port=0)
+
+        assert [sample.roll for sample in streamer.get_samples()] == [1.0, 2.0, 3.0]
+        assert streamer.get_samples() == []
+        assert streamer.get_latest().roll == 3.0
+
+
+class TestQuaternionsToEuler:
+    """Test the batched quaternion conversion"""
+
+    def test_matches_scalar_conversion(self):
+        rng = np.random.default_rng(0)
+        quaternions = rng.normal(size=(200, 4))
+        quaternions /= np.linalg.norm(quaternions, axis=1, keepdims=True)
+        # Gimbal lock: pitch of exactly +/-90 degrees
+        quaternions[:2] = [
+            [math.sqrt(0.5), 0, math.sqrt(0.5), 0],
+            [math.sqrt(0.5), 0, -math.sqrt(0.5), 0],
+        ]
+
+        euler = quaternions_to_euler(quaternions)
+        assert euler.shape == (200, 3)
+        expected = [IMUHTTPHandler._quaternion_to_euler(*q) for q in quaternions]
+        assert euler == pytest.approx(np.array(expected), abs=1e-9)
+        assert euler[:2, 1].tolist() == [90.0, -90.0]
@@ -0,0 +1,125 @@
+"""
+Tests for the tripod and Stewart platform IK solvers
+"""
+
+import numpy as np
+import pytest
+
+from inverse_kinematics import PlatformConfig, StewartPlatformIK, TripodIK
+
+CONFIG = PlatformConfig(
+    length=1.83, width=1.22, min_height=0.3, max_height=0.7, actuator_stroke=0.4
+)
+
+
+def reference_lengths(solver, roll, pitch, yaw, offset):
+    """Leg lengths computed point by point about the given pivot"""
+    cr, sr = np.cos(roll), np.sin(roll)
+    cp, sp = np.cos(pitch), np.sin(pitch)
+    cy, sy = np.cos(yaw), np.sin(yaw)
+    Rx = np.array([[1, 0, 0], [0, cr, -sr], [0, sr, cr]])
+    Ry = np.array([[cp, 0, sp], [0, 1, 0], [-sp, 0, cp]])
+    Rz = np.array([[cy, -sy, 0], [sy, cy, 0], [0, 0, 1]])
+    R = Rz @ Ry @ Rx
+
+    pivot, center = offset
+    points = [R @ (point - pivot) + center for point in solver.platform_points]
+    return np.array([np.linalg.norm(p - b) for p, b in zip(points, solver.base_points)])
+
+
+@pytest.fixture(scope="module")
+def tripod():
+    return TripodIK(CONFIG)
+
+
+@pytest.fixture(scope="module", params=["3DOF", "6DOF"])
+def stewart(request):
+    return StewartPlatformIK(CONFIG, dof_mode=request.param)
+
+
+class TestTripodIK:
+    """Test the 3-actuator tripod solver"""
+
+    def test_level_pose_is_min_height(self, tripod):
+        lengths, valid = tripod.solve(0, 0, 0)
+        assert lengths == pytest.approx([CONFIG.min_height] * 3)
+        assert valid is True
+
+    @pytest.mark.parametrize("roll, pitch, height", [(0.1, -0.05, 0.0), (-0.2, 0.15, 0.05)])
+    def test_matches_reference(self, tripod, roll, pitch, height):
+        lengths, _ = tripod.solve(roll, pitch, 0, height)
+        center = np.array([0, 0, CONFIG.min_height + height])
+        expected = reference_lengths(tripod, roll, pitch, 0, (center, center))
+        assert lengths == pytest.approx(expected, abs=1e-12)
+
+    def test_level_platform_ignores_yaw(self, tripod):
+        lengths, _ = tripod.level_platform(0.1, -0.05, 0.2)
+        assert lengths == pytest.approx(tripod.solve(-0.1, 0.05)[0])
+
+
+class TestStewartPlatformIK:
+    """Test the 6-actuator Stewart platform solver"""
+
+    @pytest.mark.parametrize(
+        "pose", [(0.1, -0.05, 0.2, 0.0, 0.0, 0.0), (-0.2, 0.15, -0.3, 0.02, -0.01, 0.05)]
+    )
+    def test_matches_reference(self, stewart, pose):
+        roll, pitch, yaw, x, y, z = pose
+        lengths, valid = stewart.solve(*pose)
+        pivot = np.array([0, 0, CONFIG.min_height])
+        center = np.array([x, y, CONFIG.min_height + z])
+        expected = reference_lengths(stewart, roll, pitch, yaw, (pivot, center))
+        assert lengths == pytest.approx(expected, abs=1e-12)
+        assert isinstance(valid, bool)
+
+    def test_level_platform_inverts_tilt(self, stewart):
+        lengths, _ = stewart.level_platform(0.1, -0.05, 0.2)
+        yaw = -0.2 if stewart.dof_mode == "6DOF" else 0
+        expected, _ = stewart.solve(-0.1, 0.05, yaw)
+        assert lengths == pytest.approx(expected)
+
+
+class TestSolveCache:
+    """Test memoizing solutions for poses rounded to cache_resolution"""
+
+    def test_cached_solve_matches_rounded_pose(self):
+        solver = StewartPlatformIK(CONFIG, dof_mode="6DOF", cache_resolution=1e-3)
+        exact = StewartPlatformIK(CONFIG, dof_mode="6DOF")
+
+        lengths, valid = solver.solve(0.10004, -0.0502, 0.2, z_offset=0.01)
+        expected, expected_valid = exact.solve(0.1, -0.05, 0.2, z_offset=0.01)
+        assert lengths == pytest.approx(expected, abs=1e-12)
+        assert valid == expected_valid
+
+        solver.solve(0.0999, -0.0498, 0.2, z_offset=0.01)
+        assert solver._solve_rounded.cache_info().hits == 1
+
+    def test_cached_results_are_copies(self):
+        solver = TripodIK(CONFIG, cache_resolution=1e-4)
+        lengths, _ = solver.solve(0.1, 0.0)
+        lengths[:] = 0.0
+        assert solver.solve(0.1, 0.0)[0] == pytest.approx(TripodIK(CONFIG).solve(0.1, 0.0)[0])
+
+
+class TestSolveBatch:
+    """Test solving many poses in one call"""
+
+    ANGLES = np.array([[0.0, 0.0, 0.0], [0.1, -0.05, 0.2], [-0.2, 0.15, -0.3], [0.6, 0.0, 0.0]])
+
+    def test_tripod_matches_solve(self, tripod):
+        lengths, valid = tripod.solve_batch(self.ANGLES, height_offset=0.02)
+        assert lengths.shape == (4, 3)
+        for pose, row, row_valid in zip(self.ANGLES, lengths, valid):
+            expected, expected_valid = tripod.solve(*pose, height_offset=0.02)
+            assert row == pytest.approx(expected, abs=1e-12)
+            assert row_valid == expected_valid
+
+    def test_stewart_matches_solve(self, stewart):
+        offsets = np.array([[0.0, 0.0, 0.0], [0.02, -0.01, 0.05], [0.0, 0.0, -0.01], [0, 0, 0]])
+        lengths, valid = stewart.solve_batch(self.ANGLES, offsets)
+        assert lengths.shape == (4, 6)
+        assert not valid[3]
+        for pose, offset, row, row_valid in zip(self.ANGLES, offsets, lengths, valid):
+            expected, expected_valid = stewart.solve(*pose, *offset)
+            assert row == pytest.approx(expected, abs=1e-12)
+            assert row_valid == expected_valid
@@ -0,0 +1,145 @@
+"""
+Tests for the auto-leveling loop of the platform leveling system
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+import leveling_system
+from imu_streamer import IMUData, IMUStreamer
+from leveling_system import LevelingConfig, PlatformLevelingSystem
+
+
+@pytest.fixture
+def system(monkeypatch):
+    # Bind the IMU to an ephemeral local port so tests don't collide on 5555
+    monkeypatch.setattr(
+        leveling_system, "IMUStreamer", lambda: IMUStreamer(host="127.0.0.1", port=0)
+    )
+    system = PlatformLevelingSystem(leveling_config=LevelingConfig(update_rate=20.0))
+    system.enable_leveling(True)
+
+    # Record the sample each leveling pass is run against
+    system.leveled = []
+    level_once = system.level_once
+
+    def spy(imu_data=None):
+        system.leveled.append(imu_data)
+        return level_once(imu_data)
+
+    system.level_once = spy
+    yield system
+    system.shutdown()
+
+
+def publish(system, roll: float, pitch: float = 0.0):
+    """Publish a sample from another thread, as the IMU receiver does"""
+    sample = IMUData(roll=roll, pitch=pitch, yaw=0.0, timestamp=time.time())
+    thread = threading.Thread(target=system.imu._publish, args=(sample,))
+    thread.start()
+    thread.join()
+    return sample
+
+
+class TestAutoLevelTask:
+    """Test auto-leveling as an asyncio task"""
+
+    def test_sample_from_another_thread_wakes_task(self, system):
+        async def run():
+            system.enable_auto_level(loop=asyncio.get_running_loop())
+            await asyncio.sleep(0.05)
+            sample = publish(system, 5.0)
+            for _ in range(40):
+                if system.leveled:
+                    break
+                await asyncio.sleep(0.025)
+            assert system.leveled == [sample]
+            assert system.last_orientation == (5.0, 0.0, 0.0)
+
+        asyncio.run(run())
+
+    def test_shutdown_from_loop(self, system):
+        async def run():
+            system.enable_auto_level(loop=asyncio.get_running_loop())
+            task = system.leveling_task
+            await asyncio.sleep(0.05)
+            system.shutdown()
+            await asyncio.gather(task, return_exceptions=True)
+            assert task.cancelled()
+            assert system.leveling_task is None
+
+        asyncio.run(run())
+
+    def test_shutdown_from_another_thread(self, system):
+        async def run():
+            system.enable_auto_level(loop=asyncio.get_running_loop())
+            task = system.leveling_task
+            await asyncio.sleep(0.05)
+            await asyncio.to_thread(system.shutdown)
+            # The loop-side cancel has finished before shutdown returned
+            assert task.cancelled()
+
+        asyncio.run(run())
+
+    def test_shutdown_after_loop_closed(self, system):
+        loop = asyncio.new_event_loop()
+        system.enable_auto_level(loop=loop)
+        # Let the task start waiting for a sample, then abandon the loop
+        loop.run_until_complete(asyncio.sleep(0.05))
+        loop.close()
+
+        system.shutdown()
+        assert system.leveling_task is None
+
+        # Samples arriving after the loop closed are ignored
+        publish(system, 5.0)
+        assert system.leveled == []
+
+
+class TestAutoLevelThread:
+    """Test auto-leveling in a background thread"""
+
+    def test_sample_wakes_loop(self, system):
+        system.enable_auto_level()
+        sample = publish(system, 5.0)
+        for _ in range(40):
+            if system.leveled:
+                break
+            time.sleep(0.025)
+        assert system.leveled == [sample]
+
+    def test_idle_loop_does_not_level(self, system):
+        system.enable_auto_level()
+        # A tilted sample that was never announced must not be picked up by polling
+        system.imu.latest_data = IMUData(roll=5.0, pitch=0.0, yaw=0.0, timestamp=time.time())
+        time.sleep(0.2)
+        assert system.leveled == []
+
+    def test_shutdown_joins_idle_loop(self, system):
+        system.leveling_config.update_rate = 0.5
+        system.enable_auto_level()
+        thread = system.leveling_thread
+        time.sleep(0.05)
+
+        start = time.monotonic()
+        system.shutdown()
+        assert not thread.is_alive()
+        # Woken by shutdown rather than waiting out the 2 s update period
+        assert time.monotonic() - start < 1.0
+
+    def test_levels_against_checked_sample(self, system):
+        checked = IMUData(roll=5.0, pitch=0.0, yaw=0.0, timestamp=time.time())
+        newer = IMUData(roll=-5.0, pitch=0.0, yaw=0.0, timestamp=time.time())
+
+        def get_latest():
+            # A newer sample is published right after the step reads the latest one
+            system.imu.latest_data = newer
+            return checked
+
+        system.imu.get_latest = get_latest
+        system._auto_level_step(system.leveling_config.deadband**2, 2.0)
+        assert system.leveled == [checked]
+        assert system.last_orientation == (5.0, 0.0, 0.0)
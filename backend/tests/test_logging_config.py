@@ -0,0 +1,122 @@
+"""
+Tests for logging helpers
+"""
+
+import asyncio
+import json
+import logging
+
+import logging_config
+from config import settings
+from logging_config import (
+    CustomJsonFormatter,
+    log_request,
+    setup_logging,
+    shutdown_logging,
+    traceback_allowed,
+)
+
+
+class TestTracebackSampling:
+    """Test the per-exception-type traceback budget"""
+
+    def test_repeats_are_suppressed_within_interval(self):
+        class FloodError(Exception):
+            pass
+
+        assert traceback_allowed(FloodError(), interval=60.0)
+        assert not traceback_allowed(FloodError(), interval=60.0)
+
+    def test_budget_is_per_exception_type(self):
+        class FirstError(Exception):
+            pass
+
+        class SecondError(Exception):
+            pass
+
+        assert traceback_allowed(FirstError(), interval=60.0)
+        assert traceback_allowed(SecondError(), interval=60.0)
+
+    def test_allowed_again_after_interval(self, monkeypatch):
+        class SlowError(Exception):
+            pass
+
+        now = [1000.0]
+        monkeypatch.setattr(logging_config.time, "monotonic", lambda: now[0])
+
+        assert traceback_allowed(SlowError(), interval=1.0)
+        now[0] += 0.5
+        assert not traceback_allowed(SlowError(), interval=1.0)
+        now[0] += 0.6
+        assert traceback_allowed(SlowError(), interval=1.0)
+
+
+class TestCustomJsonFormatter:
+    """Test the fields added to JSON log records"""
+
+    def test_timestamp_and_environment(self):
+        formatter = CustomJsonFormatter("%(timestamp)s %(level)s %(name)s %(message)s")
+        record = logging.LogRecord("api", logging.INFO, __file__, 1, "hello", None, None)
+        record.created = 1700000000.25
+
+        output = json.loads(formatter.format(record))
+        assert output["timestamp"] == "2023-11-14T22:13:20.250000"
+        assert output["environment"] == settings.environment
+        assert (output["level"], output["logger"], output["message"]) == ("INFO", "api", "hello")
+
+    def test_record_encoded_once(self, monkeypatch):
+        formatter = CustomJsonFormatter("%(timestamp)s %(level)s %(name)s %(message)s")
+        record = logging.LogRecord("api", logging.INFO, __file__, 1, "✓ ready", None, None)
+        first = formatter.format(record)
+
+        monkeypatch.setattr(formatter, "jsonify_log_record", None)
+        assert formatter.format(record) == first
+        assert json.loads(first)["message"] == "✓ ready"
+
+
+class TestQueuedLogging:
+    """Test that records reach the log files through the writer thread"""
+
+    def test_records_written_by_listener(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        setup_logging()
+        try:
+            logging.getLogger("api.test").info("queued %s", "info")
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                logging.getLogger("api.test").exception("queued error")
+        finally:
+            shutdown_logging()
+
+        api_log = (tmp_path / "logs" / "api.log").read_text().splitlines()
+        error_log = (tmp_path / "logs" / "error.log").read_text().splitlines()
+        assert [json.loads(line)["message"] for line in api_log][-2:] == [
+            "queued info",
+            "queued error",
+        ]
+        assert len(error_log) == 1
+        assert "ValueError: boom" in json.loads(error_log[0])["exception"]
+
+
+class TestLogRequest:
+    """Test the request logging middleware"""
+
+    class Request:
+        method = "GET"
+        client = None
+
+        class url:
+            path = "/health"
+
+        @property
+        def query_params(self):
+            raise AssertionError("query string formatted for a disabled log level")
+
+    def test_skipped_when_info_disabled(self, caplog):
+        async def call_next(request):
+            return "response"
+
+        caplog.set_level(logging.WARNING, logger="api.requests")
+        assert asyncio.run(log_request(self.Request(), call_next)) == "response"
+        assert caplog.records == []
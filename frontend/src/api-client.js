@@ -10,6 +10,11 @@
 const DEFAULT_API_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
 const API_KEY = process.env.REACT_APP_API_KEY || '';
 
+// Poses stream as UTF-8 JSON in binary frames so the backend can decode them
+// without an intermediate string
+const wsEncoder = new TextEncoder();
+const wsDecoder = new TextDecoder();
+
 class PlatformAPIClient {
   constructor(baseURL = DEFAULT_API_URL) {
     this.baseURL = baseURL;
@@ -178,6 +183,7 @@ class PlatformAPIClient {
 
     const wsURL = this.baseURL.replace('http://', 'ws://').replace('https://', 'wss://');
     this.ws = new WebSocket(`${wsURL}/ws`);
+    this.ws.binaryType = 'arraybuffer';
 
     this.ws.onopen = () => {
       console.log('WebSocket connected');
@@ -186,7 +192,8 @@ class PlatformAPIClient {
 
     this.ws.onmessage = (event) => {
       try {
-        const data = JSON.parse(event.data);
+        const text = typeof event.data === 'string' ? event.data : wsDecoder.decode(event.data);
+        const data = JSON.parse(text);
         if (onMessage) onMessage(data);
 
         // Notify all registered callbacks
@@ -216,7 +223,7 @@ class PlatformAPIClient {
    */
   sendWebSocketPose(pose) {
     if (this.ws && this.ws.readyState === WebSocket.OPEN) {
-      this.ws.send(JSON.stringify(pose));
+      this.ws.send(wsEncoder.encode(JSON.stringify(pose)));
     } else {
       console.warn('WebSocket not connected');
     }